@@ -1,5 +1,10 @@
+import argparse
 import sys
-from collections import deque
+
+from problem import bits, compile_problem, write_schedules
+from schedbin import write_binary
+from spill import SpillQueue
+from validate import invalid_schedules
 
 def parse_input(filename):
     assignments = {}
@@ -30,79 +35,60 @@ def parse_input(filename):
     return N, K, assignments, dependencies
 
 
-def validate_schedule(schedule, assignments, dependencies, N, K, max_days):
-    completed = set()
-    daily_usage = {}
-
-    for day, student, assignment in schedule:
-        if day > max_days:
-            return False
-
-        # Each assignment exactly once
-        if assignment in completed:
-            return False
-
-        # Dependencies
-        if not all(dep in completed for dep in dependencies[assignment]):
-            return False
-
-        # Prompt usage per student per day
-        daily_usage.setdefault(day, [0]*N)
-        daily_usage[day][student] += assignments[assignment]
+def rebuild_schedule(node):
+    # node is (parent, step); the root is None
+    schedule = []
+    while node is not None:
+        node, step = node
+        schedule.append(step)
+    schedule.reverse()
+    return schedule
 
-        if daily_usage[day][student] > K:
-            return False
 
-        completed.add(assignment)
+def bfs(problem, max_days, mem_states=200000):
+    # Schedules are shared through parent pointers, each queue entry only
+    # owns its last step. Past mem_states entries the queue spills to disk.
+    initial_state = (0, 1, tuple([0] * problem.N), None, problem.ready_mask(0))
+    with SpillQueue([initial_state], mem_states) as queue:
+        yield from bfs_queue(problem, max_days, queue)
 
-    return len(completed) == len(assignments)
 
-
-def all_dependencies_done(a, completed, dependencies):
-    return all(dep in completed for dep in dependencies[a])
-
-
-def bfs(N, K, assignments, dependencies, max_days):
-    initial_state = (frozenset(), 1, tuple([0] * N), [])
-    queue = deque([initial_state])
-    results = []
+def bfs_queue(problem, max_days, queue):
+    N, K = problem.N, problem.K
+    cost = problem.cost
 
     while queue:
-        completed, day, prompt_used, schedule = queue.popleft()
+        completed, day, prompt_used, node, ready = queue.popleft()
 
         # All assignments completed
-        if len(completed) == len(assignments):
-            results.append(schedule)
+        if completed == problem.full:
+            yield rebuild_schedule(node)
             continue
 
         if day > max_days:
             continue
+        if problem.hopeless(completed, day, prompt_used, max_days):
+            continue
 
         expanded = False
 
-        for a in assignments:
-            if a in completed:
-                continue
-            if not all_dependencies_done(a, completed, dependencies):
-                continue
+        for a in bits(ready):
+            new_completed = completed | (1 << a)
+            new_ready = problem.ready_after(ready, new_completed, a)
 
             for s in range(N):
-                if prompt_used[s] + assignments[a] <= K:
+                if prompt_used[s] + cost[a] <= K:
                     expanded = True
 
-                    new_completed = set(completed)
-                    new_completed.add(a)
-
                     new_prompt = list(prompt_used)
-                    new_prompt[s] += assignments[a]
-
-                    new_schedule = schedule + [(day, s, a)]
+                    new_prompt[s] += cost[a]
 
                     queue.append((
-                        frozenset(new_completed),
+                        new_completed,
                         day,
                         tuple(new_prompt),
-                        new_schedule
+                        (node, (day, s, a)),
+                        new_ready
                     ))
 
         # Move to next day if nothing could be scheduled today
@@ -111,34 +97,66 @@ def bfs(N, K, assignments, dependencies, max_days):
                 completed,
                 day + 1,
                 tuple([0] * N),
-                schedule
+                node,
+                ready
             ))
 
-    return results
-
 
 def main():
-    if len(sys.argv) != 3:
-        print("Usage: python scheduler.py <input-file> <number-of-days>")
-        return
-
-    filename = sys.argv[1]
-    max_days = int(sys.argv[2])
-
-    N, K, assignments, dependencies = parse_input(filename)
-
-    results = bfs(N, K, assignments, dependencies, max_days)
-
-    print(f"Total valid schedules: {len(results)}\n")
-    for i, sch in enumerate(results, 1):
-        print(f"Schedule {i}:")
-        for day, student, assignment in sch:
-            print(f"  Day {day}: Student {student + 1} → {assignment}")
-        print()
-
-    for sch in results:
-        assert validate_schedule(sch, assignments, dependencies, N, K, max_days)
-
+    parser = argparse.ArgumentParser(
+        description="Enumerate all valid assignment schedules (BFS)")
+    parser.add_argument('input_file', help="Path to input file")
+    parser.add_argument('days', type=int, help="Maximum number of days")
+    parser.add_argument('--format', choices=['text', 'bin'], default='text',
+                        help="Output format; bin writes fixed-width records "
+                             "(read them back with schedbin.py)")
+    parser.add_argument('-o', '--output',
+                        help="Output file, required with --format bin")
+    parser.add_argument('--mem-states', type=int, default=200000,
+                        help="Queue entries kept in memory before the rest "
+                             "is spilled to temporary files")
+    parser.add_argument('--batch', type=int, default=4096,
+                        help="Schedules validated together")
+    args = parser.parse_args()
+
+    if args.format == 'bin' and not args.output:
+        parser.error("--format bin needs --output")
+
+    max_days = args.days
+
+    N, K, assignments, dependencies = parse_input(args.input_file)
+
+    problem = compile_problem(N, K, assignments, dependencies)
+
+    bad = []
+
+    def checked(schedules):
+        # Validated a batch at a time, output still streams per batch
+        batch = []
+        start = 0
+        for sch in schedules:
+            batch.append(sch)
+            if len(batch) == args.batch:
+                bad.extend(start + i for i in
+                           invalid_schedules(problem, batch, max_days))
+                yield from batch
+                start += len(batch)
+                batch = []
+        bad.extend(start + i for i in
+                   invalid_schedules(problem, batch, max_days))
+        yield from batch
+
+    schedules = checked(bfs(problem, max_days, args.mem_states))
+    if args.format == 'bin':
+        total = write_binary(schedules, problem, max_days, args.output)
+    else:
+        total = write_schedules(schedules, problem)
+
+    print(f"Total valid schedules: {total}\n")
+    if bad:
+        print("Invalid schedules: " + " ".join(str(i + 1) for i in bad),
+              file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
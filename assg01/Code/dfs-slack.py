@@ -1,5 +1,13 @@
+import argparse
+import os
 import sys
-from copy import deepcopy
+
+from problem import (Checkpointer, DayPlanCache, SearchStats,
+                     compile_problem, count_schedules, iter_search,
+                     label_schedules, load_checkpoint,
+                     parallel_count, parallel_search, plan_search,
+                     sample_schedules, schedule_counter,
+                     write_schedules)
 
 def parse_input(filename):
     assignments = {}
@@ -32,101 +40,296 @@ def parse_input(filename):
 
 
 def dfs_with_slack(
+    problem,
     completed,
     day,
     prompt_used,
     schedule,
-    N,
-    K,
-    assignments,
-    dependencies,
     max_days,
-    results
+    ready=None
 ):
     # Goal condition
-    if len(completed) == len(assignments):
-        results.append(schedule.copy())
+    if completed == problem.full:
+        yield schedule.copy()
         return
 
     # Day limit exceeded
     if day > max_days:
         return
+    if problem.hopeless(completed, day, prompt_used, max_days):
+        return
+
+    if ready is None:
+        ready = problem.ready_set(completed)
 
-    # Try all assignment actions
-    for a in assignments:
-        if a in completed:
-            continue
+    N, K = problem.N, problem.K
+    cost = problem.cost
 
-        # Dependency check
-        if not all(dep in completed for dep in dependencies[a]):
-            continue
+    # Try all assignment actions (ready = not done, dependencies done)
+    for a in ready:
+        bit = 1 << a
+        ready.assign(a)
 
         for s in range(N):
-            if prompt_used[s] + assignments[a] <= K:
+            if prompt_used[s] + cost[a] <= K:
                 # Apply action
-                completed.add(a)
-                prompt_used[s] += assignments[a]
+                prompt_used[s] += cost[a]
                 schedule.append((day, s, a))
 
-                dfs_with_slack(
-                    completed,
+                yield from dfs_with_slack(
+                    problem,
+                    completed | bit,
                     day,
                     prompt_used,
                     schedule,
-                    N,
-                    K,
-                    assignments,
-                    dependencies,
                     max_days,
-                    results
+                    ready
                 )
 
                 # Backtrack
                 schedule.pop()
-                prompt_used[s] -= assignments[a]
-                completed.remove(a)
+                prompt_used[s] -= cost[a]
+
+        ready.undo(a)
 
     # 🔹 SLACK ACTION (intentional idle)
     # Move to next day even if work is possible
-    dfs_with_slack(
+    yield from dfs_with_slack(
+        problem,
         completed,
         day + 1,
         [0] * N,
         schedule,
-        N,
-        K,
-        assignments,
-        dependencies,
         max_days,
-        results
+        ready
     )
 
 
+def dfs_with_slack_symmetric(
+    problem,
+    completed,
+    day,
+    prompt_used,
+    touched,
+    schedule,
+    max_days,
+    ready=None
+):
+    # Students that have not done anything yet are interchangeable, so
+    # only the first of them (index `touched`) is tried. Yields canonical
+    # schedules, students numbered in order of first use; label_schedules
+    # expands them.
+    if completed == problem.full:
+        yield schedule.copy()
+        return
+
+    if day > max_days:
+        return
+    if problem.hopeless(completed, day, prompt_used, max_days):
+        return
+
+    if ready is None:
+        ready = problem.ready_set(completed)
 
+    N, K = problem.N, problem.K
+    cost = problem.cost
 
-def main():
-    if len(sys.argv) != 3:
-        print("Usage: python scheduler.py <input-file> <number-of-days>")
+    for a in ready:
+        bit = 1 << a
+        ready.assign(a)
+
+        for s in range(min(touched + 1, N)):
+            if prompt_used[s] + cost[a] <= K:
+                prompt_used[s] += cost[a]
+                schedule.append((day, s, a))
+
+                if s == touched:
+                    yield from dfs_with_slack_symmetric(
+                        problem, completed | bit, day, prompt_used,
+                        touched + 1, schedule, max_days, ready
+                    )
+                else:
+                    yield from dfs_with_slack_symmetric(
+                        problem, completed | bit, day, prompt_used,
+                        touched, schedule, max_days, ready
+                    )
+
+                schedule.pop()
+                prompt_used[s] -= cost[a]
+
+        ready.undo(a)
+
+    yield from dfs_with_slack_symmetric(
+        problem,
+        completed,
+        day + 1,
+        [0] * N,
+        touched,
+        schedule,
+        max_days,
+        ready
+    )
+
+
+def run_checkpointed(args, problem, max_days, stats):
+    # The checkpoint ties a search position to the output written so far
+    info = {"input": os.path.abspath(args.input_file), "days": max_days}
+    resume, done = None, 0
+
+    if args.resume:
+        if not os.path.exists(args.checkpoint):
+            sys.exit(f"No checkpoint at {args.checkpoint}")
+        saved = load_checkpoint(args.checkpoint)
+        if saved["input"] != info["input"] or saved["days"] != max_days:
+            sys.exit(f"{args.checkpoint} belongs to another run")
+        resume, done = saved.get("position"), saved["count"]
+        # Drop whatever was written after the checkpoint
+        with open(args.output, "r+") as out:
+            out.truncate(saved["offset"])
+        mode = "a"
+    else:
+        mode = "w"
+
+    with open(args.output, mode) as out:
+        checkpoint = Checkpointer(args.checkpoint, out,
+                                  args.checkpoint_every, done, info)
+        schedules = checkpoint.written(
+            iter_search(problem, max_days, slack=True,
+                        node_budget=args.node_budget, stats=stats,
+                        resume=resume, checkpoint=checkpoint))
+        total = done + write_schedules(schedules, problem, arrow="->",
+                                       out=out, start=done)
+        out.write(f"Total valid schedules: {total}\n\n")
+
+    if stats.exhausted:
+        print(stats.report(), file=sys.stderr)
+        print(f"Continue with --resume from {args.checkpoint}",
+              file=sys.stderr)
         return
+    if os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    if args.stats:
+        print(stats.report(), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Enumerate all valid assignment schedules")
+    parser.add_argument('input_file', help="Path to input file")
+    parser.add_argument('days', type=int, help="Maximum number of days")
+    parser.add_argument('--count', action='store_true',
+                        help="Only print the number of valid schedules")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Search subtrees in this many processes")
+    parser.add_argument('--split-depth', type=int, default=3,
+                        help="Tree depth at which work is split (--workers)")
+    parser.add_argument('--node-budget', type=int, default=None,
+                        help="Stop the search after this many nodes")
+    parser.add_argument('--stats', action='store_true',
+                        help="Report nodes expanded and nodes/sec on stderr")
+    parser.add_argument('--sample', type=int, default=None, metavar='S',
+                        help="Print S uniformly random valid schedules")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Random seed for --sample")
+    parser.add_argument('--day-plans', action='store_true',
+                        help="Search one day at a time over cached day plans")
+    parser.add_argument('--plan-cache', type=int, default=4096,
+                        help="Completed sets whose day plans are kept "
+                             "(--day-plans)")
+    parser.add_argument('--symmetry', action='store_true',
+                        help="Search only canonical student orderings")
+    parser.add_argument('-o', '--output',
+                        help="Write the schedules to this file")
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help="Save the search position to FILE periodically "
+                             "(needs --output)")
+    parser.add_argument('--checkpoint-every', type=float, default=60.0,
+                        metavar='SECS', help="Seconds between checkpoints")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue from the position saved in "
+                             "--checkpoint, appending to --output")
+    args = parser.parse_args()
 
-    filename = sys.argv[1]
-    max_days = int(sys.argv[2])
+    if args.workers > 1 and args.symmetry:
+        parser.error("--workers cannot be combined with --symmetry")
+    if args.sample is not None and (args.workers > 1 or args.symmetry
+                                    or args.day_plans):
+        parser.error("--sample cannot be combined with --workers, "
+                     "--symmetry or --day-plans")
+    # Only the plain search counts nodes; --day-plans reports its cache
+    if args.node_budget is not None and (args.count or args.workers > 1
+                                         or args.sample is not None
+                                         or args.day_plans or args.symmetry):
+        parser.error("--node-budget only works with the plain search")
+    if args.stats and (args.count or args.workers > 1
+                       or args.sample is not None or args.symmetry):
+        parser.error("--stats only works with the plain search "
+                     "and --day-plans")
+    if args.checkpoint and not args.output:
+        parser.error("--checkpoint needs --output")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
+    if args.checkpoint and (args.symmetry or args.workers > 1
+                            or args.sample is not None or args.day_plans):
+        parser.error("--checkpoint only works with the plain search")
+
+    max_days = args.days
+
+    N, K, assignments, dependencies = parse_input(args.input_file)
+
+    problem = compile_problem(N, K, assignments, dependencies)
+    stats = SearchStats()
+
+    if args.count:
+        if args.workers > 1:
+            total = parallel_count(problem, max_days, args.workers,
+                                   args.split_depth, slack=True)
+        else:
+            total = count_schedules(problem, max_days, slack=True,
+                                    symmetric=args.symmetry)
+        print(f"Total valid schedules: {total}\n")
+        return
 
-    N, K, assignments, dependencies = parse_input(filename)
+    if args.symmetry:
+        canonical = dfs_with_slack_symmetric(
+            problem, 0, 1, [0]*N, 0, [], max_days)
+        schedules = (labelled
+                     for sch in canonical
+                     for labelled in label_schedules(sch, N))
+    elif args.workers > 1:
+        schedules = parallel_search(dfs_with_slack, problem, max_days,
+                                    args.workers, args.split_depth, slack=True)
+    elif args.sample is not None:
+        # The counts the sampler walks down also give the population
+        counter = schedule_counter(problem, max_days, slack=True)
+        population = count_schedules(problem, max_days, counter=counter)
+        schedules = sample_schedules(problem, max_days, args.sample,
+                                     args.seed, counter=counter)
+    elif args.day_plans:
+        cache = DayPlanCache(problem, slack=True, maxsize=args.plan_cache)
+        schedules = plan_search(problem, max_days, cache)
+    elif args.checkpoint:
+        return run_checkpointed(args, problem, max_days, stats)
+    else:
+        schedules = iter_search(problem, max_days, slack=True,
+                                node_budget=args.node_budget, stats=stats)
 
-    results = []
-    dfs_with_slack(set(), 1, [0]*N, [],
-        N, K, assignments, dependencies, max_days, results)
-    
+    out = open(args.output, "w") if args.output else sys.stdout
+    total = write_schedules(schedules, problem, arrow="->", out=out)
+    if args.sample is not None:
+        out.write(f"Samples: {total} of {population} valid schedules\n\n")
+    else:
+        out.write(f"Total valid schedules: {total}\n\n")
+    if args.output:
+        out.close()
 
-    for i, sch in enumerate(results, 1):
-        print(f"Schedule {i}:")
-        for day, student, assignment in sch:
-            print(f"  Day {day}: Student {student+1} -> {assignment}")
-        print()
+    if args.day_plans:
+        if args.stats:
+            print(f"Day plan cache: {cache.hits} hits, {cache.misses} misses",
+                  file=sys.stderr)
+    elif args.stats or stats.exhausted:
+        print(stats.report(), file=sys.stderr)
 
-    print(f"Total valid schedules: {len(results)}\n")
-        
 
 if __name__ == "__main__":
     main()
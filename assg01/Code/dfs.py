@@ -1,5 +1,12 @@
+import argparse
 import sys
-from copy import deepcopy
+
+from problem import (DayPlanCache, SearchStats, compile_problem,
+                     count_orderings, count_schedules, iter_search,
+                     parallel_count, parallel_search, plan_search,
+                     sample_schedules, schedule_counter,
+                     write_schedules)
+from schedbin import write_binary
 
 def parse_input(filename):
     assignments = {}
@@ -30,71 +37,239 @@ def parse_input(filename):
     return N, K, assignments, dependencies
 
 
-def all_dependencies_done(a, completed, dependencies):
-    return all(dep in completed for dep in dependencies[a])
+def dfs(problem, completed, day, prompt_used, schedule, max_days,
+        ready=None):
+
+    if completed == problem.full:
+        yield list(schedule)
+        return
+
+    if day > max_days:
+        return
+    if problem.hopeless(completed, day, prompt_used, max_days):
+        return
+
+    if ready is None:
+        ready = problem.ready_set(completed)
+
+    progress = False
+    N, K = problem.N, problem.K
+    cost = problem.cost
+
+    for a in ready:
+        bit = 1 << a
+        ready.assign(a)
+
+        for s in range(N):
+            if prompt_used[s] + cost[a] <= K:
+                progress = True
+
+                prompt_used[s] += cost[a]
+                schedule.append((day, s, a))
+
+                yield from dfs(problem, completed | bit, day, prompt_used,
+                               schedule, max_days, ready)
 
+                schedule.pop()
+                prompt_used[s] -= cost[a]
 
-def dfs(completed, day, prompt_used, schedule,
-        N, K, assignments, dependencies, max_days, results):
+        ready.undo(a)
+
+    if not progress:
+        yield from dfs(problem, completed, day + 1, [0]*N, schedule,
+                       max_days, ready)
 
-    if len(completed) == len(assignments):
-        results.append(deepcopy(schedule))
+
+def is_canonical_next(a, today, dep_mask):
+    # Within a day only the smallest-index order of a plan is kept: `a`
+    # may follow an assignment with a larger index only if it depends on
+    # something done after that one.
+    for b in reversed(today):
+        if dep_mask[a] >> b & 1:
+            return True
+        if b > a:
+            return False
+    return True
+
+
+def dfs_canonical(problem, completed, day, prompt_used, today, schedule,
+                  max_days, ready=None):
+    # Same search as dfs, but each day plan is produced once instead of
+    # once per valid ordering of its assignments.
+
+    if completed == problem.full:
+        yield list(schedule)
         return
 
     if day > max_days:
         return
+    if problem.hopeless(completed, day, prompt_used, max_days):
+        return
+
+    if ready is None:
+        ready = problem.ready_set(completed)
 
     progress = False
+    N, K = problem.N, problem.K
+    cost, dep_mask = problem.cost, problem.dep_mask
 
-    for a in assignments:
-        if a in completed:
-            continue
-        if not all_dependencies_done(a, completed, dependencies):
-            continue
+    for a in ready:
+        bit = 1 << a
+        canonical = is_canonical_next(a, today, dep_mask)
+        ready.assign(a)
 
         for s in range(N):
-            if prompt_used[s] + assignments[a] <= K:
+            if prompt_used[s] + cost[a] <= K:
+                # The day only ends when nothing fits, canonical or not.
                 progress = True
+                if not canonical:
+                    break
 
-                completed.add(a)
-                prompt_used[s] += assignments[a]
+                prompt_used[s] += cost[a]
                 schedule.append((day, s, a))
+                today.append(a)
 
-                dfs(completed, day, prompt_used, schedule,
-                    N, K, assignments, dependencies, max_days, results)
+                yield from dfs_canonical(problem, completed | bit, day,
+                                         prompt_used, today, schedule,
+                                         max_days, ready)
 
+                today.pop()
                 schedule.pop()
-                prompt_used[s] -= assignments[a]
-                completed.remove(a)
+                prompt_used[s] -= cost[a]
+
+        ready.undo(a)
 
     if not progress:
-        dfs(completed, day + 1, [0]*N, schedule,
-            N, K, assignments, dependencies, max_days, results)
-        
+        yield from dfs_canonical(problem, completed, day + 1, [0]*N, [],
+                                 schedule, max_days, ready)
 
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Enumerate all valid assignment schedules")
+    parser.add_argument('input_file', help="Path to input file")
+    parser.add_argument('days', type=int, help="Maximum number of days")
+    parser.add_argument('--count', action='store_true',
+                        help="Only print the number of valid schedules")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Search subtrees in this many processes")
+    parser.add_argument('--split-depth', type=int, default=3,
+                        help="Tree depth at which work is split (--workers)")
+    parser.add_argument('--node-budget', type=int, default=None,
+                        help="Stop the search after this many nodes")
+    parser.add_argument('--stats', action='store_true',
+                        help="Report nodes expanded and nodes/sec on stderr")
+    parser.add_argument('--sample', type=int, default=None, metavar='S',
+                        help="Print S uniformly random valid schedules")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Random seed for --sample")
+    parser.add_argument('--day-plans', action='store_true',
+                        help="Search one day at a time over cached day plans")
+    parser.add_argument('--plan-cache', type=int, default=4096,
+                        help="Completed sets whose day plans are kept "
+                             "(--day-plans)")
+    parser.add_argument('--canonical', action='store_true',
+                        help="Enumerate each day plan once, ignoring the "
+                             "order of assignments within a day")
+    parser.add_argument('--expanded', action='store_true',
+                        help="With --canonical, also count every ordering")
+    parser.add_argument('--format', choices=['text', 'bin'], default='text',
+                        help="Output format; bin writes fixed-width records "
+                             "(read them back with schedbin.py)")
+    parser.add_argument('-o', '--output',
+                        help="Output file, required with --format bin")
+    args = parser.parse_args()
 
+    if args.format == 'bin' and not args.output:
+        parser.error("--format bin needs --output")
 
-def main():
-    if len(sys.argv) != 3:
-        print("Usage: python scheduler.py <input-file> <number-of-days>")
-        return
+    if args.workers > 1 and args.canonical:
+        parser.error("--workers cannot be combined with --canonical")
+    if args.sample is not None and (args.workers > 1 or args.canonical
+                                    or args.day_plans):
+        parser.error("--sample cannot be combined with --workers, "
+                     "--canonical or --day-plans")
+    # Only the plain search counts nodes; --day-plans reports its cache
+    if args.node_budget is not None and (args.count or args.workers > 1
+                                         or args.sample is not None
+                                         or args.day_plans or args.canonical):
+        parser.error("--node-budget only works with the plain search")
+    if args.stats and (args.count or args.workers > 1
+                       or args.sample is not None or args.canonical):
+        parser.error("--stats only works with the plain search "
+                     "and --day-plans")
+
+    max_days = args.days
+
+    N, K, assignments, dependencies = parse_input(args.input_file)
+
+    problem = compile_problem(N, K, assignments, dependencies)
+    stats = SearchStats()
+
+    if args.canonical:
+        memo = {}
+        orderings = 0
 
-    filename = sys.argv[1]
-    max_days = int(sys.argv[2])
+        def tally(schedules):
+            nonlocal orderings
+            for sch in schedules:
+                if args.expanded:
+                    orderings += count_orderings(problem, sch, memo)
+                yield sch
 
-    N, K, assignments, dependencies = parse_input(filename)
+        schedules = tally(dfs_canonical(problem, 0, 1, [0]*N, [], [],
+                                        max_days))
+        if args.count:
+            total = sum(1 for _ in schedules)
+        elif args.format == 'bin':
+            total = write_binary(schedules, problem, max_days, args.output)
+        else:
+            total = write_schedules(schedules, problem)
+
+        print(f"Total canonical day plans: {total}\n")
+        if args.expanded:
+            print(f"Total valid schedules: {orderings}\n")
+        return
+
+    if args.count:
+        if args.workers > 1:
+            total = parallel_count(problem, max_days, args.workers,
+                                   args.split_depth)
+        else:
+            total = count_schedules(problem, max_days, slack=False)
+        print(f"Total valid schedules: {total}\n")
+        return
 
-    results = []
-    dfs(set(), 1, [0]*N, [],
-        N, K, assignments, dependencies, max_days, results)
+    if args.workers > 1:
+        schedules = parallel_search(dfs, problem, max_days, args.workers,
+                                    args.split_depth)
+    elif args.sample is not None:
+        # The counts the sampler walks down also give the population
+        counter = schedule_counter(problem, max_days, slack=False)
+        population = count_schedules(problem, max_days, counter=counter)
+        schedules = sample_schedules(problem, max_days, args.sample,
+                                     args.seed, counter=counter)
+    elif args.day_plans:
+        cache = DayPlanCache(problem, slack=False, maxsize=args.plan_cache)
+        schedules = plan_search(problem, max_days, cache)
+    else:
+        schedules = iter_search(problem, max_days, slack=False,
+                                node_budget=args.node_budget, stats=stats)
+    if args.format == 'bin':
+        total = write_binary(schedules, problem, max_days, args.output)
+    else:
+        total = write_schedules(schedules, problem)
 
-    print(f"Total valid schedules: {len(results)}\n")
-    for i, sch in enumerate(results, 1):
-        print(f"Schedule {i}:")
-        for day, student, assignment in sch:
-            print(f"  Day {day}: Student {student+1} → {assignment}")
-        print()
+    if args.sample is not None:
+        print(f"Samples: {total} of {population} valid schedules\n")
+    else:
+        print(f"Total valid schedules: {total}\n")
+    if args.day_plans:
+        if args.stats:
+            print(f"Day plan cache: {cache.hits} hits, {cache.misses} misses",
+                  file=sys.stderr)
+    elif args.stats or stats.exhausted:
+        print(stats.report(), file=sys.stderr)
         
 
 if __name__ == "__main__":
@@ -0,0 +1,765 @@
+import json
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+
+from readyset import ReadySet
+
+
+class CompiledProblem:
+    """Integer form of a parsed input.
+
+    Assignments are numbered 0..A-1 in input order, `completed` becomes one
+    int bitmask and every assignment gets a precomputed dependency mask, so
+    "all dependencies done" is a single AND.
+    """
+
+    def __init__(self, N, K, assignments, dependencies):
+        self.N = N
+        self.K = K
+        self.names = list(assignments)
+        self.A = len(self.names)
+
+        index = {a: i for i, a in enumerate(self.names)}
+
+        # A dependency on an assignment that is not in the input can never
+        # be satisfied, point it at a bit that is never set.
+        missing = self.A
+
+        self.cost = [assignments[a] for a in self.names]
+        self.deps = [[index.get(dep, missing) for dep in dependencies[a]]
+                     for a in self.names]
+        self.dep_mask = []
+        for deps in self.deps:
+            mask = 0
+            for dep in deps:
+                mask |= 1 << dep
+            self.dep_mask.append(mask)
+
+        # succ[i] / succ_mask[i]: assignments that directly depend on i
+        self.succ = [[] for _ in range(self.A)]
+        self.succ_mask = [0] * self.A
+        for i, mask in enumerate(self.dep_mask):
+            for j in range(self.A):
+                if mask >> j & 1:
+                    self.succ[j].append(i)
+                    self.succ_mask[j] |= 1 << i
+
+        self.full = (1 << self.A) - 1
+
+        # Bounds for pruning. `impossible` covers inputs no number of days
+        # can schedule: an assignment over K, or dependencies that are
+        # missing or cyclic. Costs of a completed mask are summed a byte
+        # at a time from lookup tables.
+        self.total_cost = sum(self.cost)
+        self.impossible = (
+            any(c > K for c in self.cost) or not self._acyclic()
+        )
+        self._byte_cost = []
+        for base in range(0, self.A, 8):
+            table = [0] * 256
+            for b in range(1, 256):
+                low = b & -b
+                i = base + low.bit_length() - 1
+                table[b] = table[b ^ low] + (self.cost[i] if i < self.A else 0)
+            self._byte_cost.append(table)
+
+    def _acyclic(self):
+        done = 0
+        while done != self.full:
+            ready = self.ready_mask(done)
+            if not ready:
+                return False
+            done |= ready
+        return True
+
+    def completed_cost(self, completed):
+        total = 0
+        for table in self._byte_cost:
+            total += table[completed & 0xFF]
+            completed >>= 8
+        return total
+
+    def hopeless(self, completed, day, prompt_used, max_days):
+        """True if no schedule can be finished from this state.
+
+        The remaining prompts must fit into what is left of today plus
+        N*K for every later day. Dependency chains give no day bound of
+        their own because work done earlier today is already shared.
+        """
+        if self.impossible:
+            return True
+        capacity = self.N * self.K
+        left = capacity - sum(prompt_used) + capacity * (max_days - day)
+        return self.total_cost - self.completed_cost(completed) > left
+
+    def is_ready(self, i, completed):
+        m = self.dep_mask[i]
+        return (completed & m) == m
+
+    def ready_set(self, completed):
+        # For searches that assign/undo in place (dfs and friends)
+        done = [i for i in range(self.A) if completed >> i & 1]
+        return ReadySet({i: self.deps[i] for i in range(self.A)}, done)
+
+    def ready_mask(self, completed):
+        mask = 0
+        for i in range(self.A):
+            if not completed >> i & 1 and self.is_ready(i, completed):
+                mask |= 1 << i
+        return mask
+
+    def ready_after(self, ready, completed, a):
+        """Ready mask once `a` is done, for searches that copy their state.
+
+        `completed` already includes `a`; only the successors of `a` can
+        become ready, so this is O(out-degree).
+        """
+        ready &= ~(1 << a)
+        dep_mask = self.dep_mask
+        for b in self.succ[a]:
+            if (completed & dep_mask[b]) == dep_mask[b]:
+                ready |= 1 << b
+        return ready
+
+
+def bits(mask):
+    # Set bit positions of `mask`, lowest first
+    while mask:
+        low = mask & -mask
+        mask ^= low
+        yield low.bit_length() - 1
+
+
+def compile_problem(N, K, assignments, dependencies):
+    return CompiledProblem(N, K, assignments, dependencies)
+
+
+def schedule_counter(problem, max_days, slack=False, symmetric=False):
+    """Memoized count(completed, day, prompt_used, touched, ready) of the
+    valid schedules below a state; see count_schedules."""
+    N, K = problem.N, problem.K
+    cost, full = problem.cost, problem.full
+    memo = {}
+
+    def count(completed, day, prompt_used, touched, ready):
+        if completed == full:
+            return 1
+        if day > max_days:
+            return 0
+        if problem.hopeless(completed, day, prompt_used, max_days):
+            return 0
+
+        key = (completed, day, prompt_used, touched)
+        if key in memo:
+            return memo[key]
+
+        total = 0
+        progress = False
+
+        for a in bits(ready):
+            new_completed = completed | (1 << a)
+            new_ready = problem.ready_after(ready, new_completed, a)
+
+            students = range(min(touched + 1, N)) if symmetric else range(N)
+            for s in students:
+                if prompt_used[s] + cost[a] <= K:
+                    progress = True
+                    new_prompt = list(prompt_used)
+                    new_prompt[s] += cost[a]
+                    if symmetric and s == touched:
+                        total += (N - touched) * count(
+                            new_completed, day, tuple(new_prompt),
+                            touched + 1, new_ready)
+                    else:
+                        total += count(new_completed, day, tuple(new_prompt),
+                                       touched, new_ready)
+
+        if slack or not progress:
+            total += count(completed, day + 1, tuple([0] * N), touched, ready)
+
+        memo[key] = total
+        return total
+
+    return count
+
+
+def count_schedules(problem, max_days, slack=False, symmetric=False,
+                    start=None, counter=None):
+    """Number of valid schedules, without building any of them.
+
+    Subproblems are memoized on (completed, day, per-student usage); with
+    `slack` the day may also be ended while work is still possible, as in
+    dfs_with_slack. With `symmetric` students are numbered in order of
+    first use and each new student counts for all the untouched ones.
+    `start` is an optional (completed, day, prompt_used) state to count
+    from instead of the empty schedule; `counter` an existing
+    schedule_counter to reuse (and fill) instead of a fresh one.
+    """
+    count = counter or schedule_counter(problem, max_days, slack, symmetric)
+    if start is None:
+        start = (0, 1, [0] * problem.N)
+    completed, day, prompt_used = start
+    return count(completed, day, tuple(prompt_used), 0,
+                 problem.ready_mask(completed))
+
+
+def sample_schedules(problem, max_days, samples, seed=None, slack=False,
+                     counter=None):
+    """Exact uniform random schedules, drawn with replacement.
+
+    Every subtree is counted once with the memoized counter, then each
+    sample walks down from the root choosing a child with probability
+    proportional to the schedules below it. No schedule list is built.
+    `counter` may be a schedule_counter that has already done the work.
+    """
+    N, K = problem.N, problem.K
+    cost, full = problem.cost, problem.full
+    count = counter or schedule_counter(problem, max_days, slack)
+    rng = random.Random(seed)
+
+    root = (0, 1, tuple([0] * N), problem.ready_mask(0))
+    total = count(root[0], root[1], root[2], 0, root[3])
+    if total == 0:
+        return
+
+    for _ in range(samples):
+        completed, day, prompt_used, ready = root
+        schedule = []
+        # r picks one leaf; children are laid out in dfs order
+        r = rng.randrange(total)
+
+        while completed != full:
+            chosen = None
+            for a in bits(ready):
+                new_completed = completed | (1 << a)
+                new_ready = problem.ready_after(ready, new_completed, a)
+
+                for s in range(N):
+                    if prompt_used[s] + cost[a] <= K:
+                        new_prompt = list(prompt_used)
+                        new_prompt[s] += cost[a]
+                        new_prompt = tuple(new_prompt)
+                        below = count(new_completed, day, new_prompt, 0,
+                                      new_ready)
+                        if r < below:
+                            chosen = (new_completed, day, new_prompt,
+                                      new_ready, (day, s, a))
+                            break
+                        r -= below
+                if chosen is not None:
+                    break
+
+            if chosen is None:
+                # What is left of r lies under the "next day" child
+                chosen = (completed, day + 1, tuple([0] * N), ready, None)
+
+            completed, day, prompt_used, ready, step = chosen
+            if step is not None:
+                schedule.append(step)
+
+        yield schedule
+
+
+def count_orderings(problem, schedule, memo):
+    """How many dfs schedules one canonical (dfs_canonical) schedule stands for.
+
+    Every day's assignments may be done in any order that respects the
+    dependencies between them; the result is the product over days of the
+    number of such orderings. `memo` maps a day's assignment mask to its
+    count and can be shared between calls.
+    """
+    succ_mask = problem.succ_mask
+
+    def orderings(mask):
+        if mask & (mask - 1) == 0:
+            return 1
+        if mask in memo:
+            return memo[mask]
+
+        # Count by the assignment done last: nothing else today needs it.
+        total = 0
+        m = mask
+        while m:
+            low = m & -m
+            m ^= low
+            if succ_mask[low.bit_length() - 1] & mask == 0:
+                total += orderings(mask ^ low)
+
+        memo[mask] = total
+        return total
+
+    day_masks = {}
+    for day, _, a in schedule:
+        day_masks[day] = day_masks.get(day, 0) | (1 << a)
+
+    total = 1
+    for mask in day_masks.values():
+        total *= orderings(mask)
+    return total
+
+
+def label_schedules(schedule, N):
+    """Every labelled schedule represented by a canonical one.
+
+    Canonical schedules number students 0..k-1 in order of first use;
+    each injective relabelling onto the N real students is a distinct
+    valid schedule, N!/(N-k)! in total.
+    """
+    used = 1 + max((s for _, s, _ in schedule), default=-1)
+    for perm in permutations(range(N), used):
+        yield [(day, perm[s], a) for day, s, a in schedule]
+
+
+class SearchStats:
+    """Node count and throughput of a search, filled in as it runs."""
+
+    def __init__(self):
+        self.nodes = 0
+        self.exhausted = False
+        self.start = time.perf_counter()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def nodes_per_sec(self):
+        elapsed = self.elapsed()
+        return self.nodes / elapsed if elapsed > 0 else 0.0
+
+    def report(self):
+        text = f"Nodes expanded: {self.nodes} ({self.nodes_per_sec():.0f} nodes/sec)"
+        if self.exhausted:
+            text += ", node budget exhausted"
+        return text
+
+
+def iter_search(problem, max_days, slack=False, node_budget=None,
+                stats=None, resume=None, checkpoint=None):
+    """dfs / dfs_with_slack with an explicit frame stack.
+
+    Yields the same schedules in the same order as the recursive searches
+    but does not depend on the recursion limit. Each frame holds the
+    moves of one node ((assignment, student) or None for "next day") and
+    the index of the next one to try. Stops early once `node_budget`
+    nodes have been entered, setting stats.exhausted.
+
+    A position is the list of frame indices at a point where the node
+    reached by each frame's last move is finished (or, for a frame at
+    index 0, no move has been made yet). `checkpoint` (a Checkpointer)
+    is offered the position between nodes and given it when the node
+    budget runs out; passing it back as `resume` carries on from there.
+    An empty or missing `resume` starts from the beginning.
+    """
+    if stats is None:
+        stats = SearchStats()
+
+    N, K = problem.N, problem.K
+    cost, full = problem.cost, problem.full
+
+    ready = problem.ready_set(0)
+    completed = 0
+    day = 1
+    prompt_used = [0] * N
+    schedule = []
+
+    def node_moves():
+        moves = []
+        for a in ready:
+            for s in range(N):
+                if prompt_used[s] + cost[a] <= K:
+                    moves.append((a, s))
+        if slack or not moves:
+            moves.append(None)
+        return moves
+
+    stack = []
+    entering = True
+
+    if resume:
+        # Walk back down to the saved position; every frame has already
+        # made move i - 1
+        for i in resume:
+            moves = node_moves()
+            frame = [moves, i, None]
+            stack.append(frame)
+            if i == 0:
+                break
+            move = moves[i - 1]
+            if move is None:
+                frame[2] = prompt_used
+                prompt_used = [0] * N
+                day += 1
+            else:
+                a, s = move
+                ready.assign(a)
+                completed |= 1 << a
+                prompt_used[s] += cost[a]
+                schedule.append((day, s, a))
+        entering = False
+
+    while True:
+        if entering:
+            entering = False
+            if node_budget is not None and stats.nodes >= node_budget:
+                stats.exhausted = True
+                if checkpoint is not None:
+                    # The node just moved to was not entered: step back
+                    position = [frame[1] for frame in stack]
+                    if position:
+                        position[-1] -= 1
+                    checkpoint.save(position)
+                return
+            stats.nodes += 1
+
+            if completed == full:
+                yield list(schedule)
+            elif (day <= max_days
+                  and not problem.hopeless(completed, day, prompt_used,
+                                           max_days)):
+                # [moves, next move, prompt_used saved by a day move]
+                stack.append([node_moves(), 0, None])
+
+        if not stack:
+            return
+        if checkpoint is not None:
+            checkpoint.tick(stack)
+
+        frame = stack[-1]
+        moves, i, saved = frame
+
+        # Undo the move this frame made last
+        if i > 0:
+            move = moves[i - 1]
+            if move is None:
+                day -= 1
+                prompt_used = saved
+            else:
+                a, s = move
+                schedule.pop()
+                prompt_used[s] -= cost[a]
+                completed ^= 1 << a
+                ready.undo(a)
+
+        if i == len(moves):
+            stack.pop()
+            continue
+
+        move = moves[i]
+        frame[1] = i + 1
+        if move is None:
+            frame[2] = prompt_used
+            prompt_used = [0] * N
+            day += 1
+        else:
+            a, s = move
+            ready.assign(a)
+            completed |= 1 << a
+            prompt_used[s] += cost[a]
+            schedule.append((day, s, a))
+        entering = True
+
+
+def load_checkpoint(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+class Checkpointer:
+    """Saves the search position of iter_search together with the output
+    written so far.
+
+    `path` is replaced by a JSON record of the position, the number of
+    schedules written and the size of `out`, at most every `every`
+    seconds. Schedules must be passed through written() so the count
+    only includes those the consumer has taken.
+    """
+
+    def __init__(self, path, out, every=60.0, count=0, info=None):
+        self.path = path
+        self.out = out
+        self.every = every
+        self.count = count
+        self.info = info or {}
+        self.last = time.perf_counter()
+        self.calls = 0
+
+    def tick(self, stack):
+        # Reading the clock on every node would cost more than the node
+        self.calls += 1
+        if self.calls % 1024:
+            return
+        if time.perf_counter() - self.last >= self.every:
+            self.save([frame[1] for frame in stack])
+
+    def save(self, position):
+        self.out.flush()
+        record = dict(self.info, position=position, count=self.count,
+                      offset=self.out.tell())
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp, self.path)
+        self.last = time.perf_counter()
+
+    def written(self, schedules):
+        for sch in schedules:
+            yield sch
+            # The consumer is back for the next one, so `sch` is written
+            self.count += 1
+
+
+class DayPlanCache:
+    """Every way to spend one day, per completed mask, with LRU eviction.
+
+    A day plan is the ordered list of (student, assignment) steps taken
+    from a day start until the day ends, plus the completed mask it leads
+    to. Without slack a day only ends when nothing fits; with slack it
+    may end after any step. Plans depend on the whole completed mask,
+    not only on the ready set: it also decides what becomes ready during
+    the day. Plans are listed in the order dfs / dfs_with_slack would
+    reach them.
+    """
+
+    def __init__(self, problem, slack=False, maxsize=4096):
+        self.problem = problem
+        self.slack = slack
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def plans(self, completed):
+        plans = self.cache.get(completed)
+        if plans is not None:
+            self.cache.move_to_end(completed)
+            self.hits += 1
+            return plans
+
+        self.misses += 1
+        plans = self._enumerate(completed)
+        self.cache[completed] = plans
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+        return plans
+
+    def _enumerate(self, start):
+        problem = self.problem
+        N, K = problem.N, problem.K
+        cost, full = problem.cost, problem.full
+        slack = self.slack
+        plans = []
+        steps = []
+        prompt_used = [0] * N
+
+        def walk(completed, ready):
+            if completed == full:
+                plans.append((tuple(steps), completed))
+                return
+
+            progress = False
+            for a in bits(ready):
+                new_completed = completed | (1 << a)
+                new_ready = problem.ready_after(ready, new_completed, a)
+
+                for s in range(N):
+                    if prompt_used[s] + cost[a] <= K:
+                        progress = True
+                        prompt_used[s] += cost[a]
+                        steps.append((s, a))
+
+                        walk(new_completed, new_ready)
+
+                        steps.pop()
+                        prompt_used[s] -= cost[a]
+
+            if slack or not progress:
+                plans.append((tuple(steps), completed))
+
+        walk(start, problem.ready_mask(start))
+        return plans
+
+
+def plan_search(problem, max_days, cache):
+    """dfs / dfs_with_slack one day at a time, over cached day plans.
+
+    Yields the same schedules in the same order as the search the cache
+    was built for.
+    """
+    N, full = problem.N, problem.full
+    schedule = []
+
+    def search(completed, day):
+        if completed == full:
+            yield list(schedule)
+            return
+        if day > max_days:
+            return
+        if problem.hopeless(completed, day, [0] * N, max_days):
+            return
+
+        for steps, new_completed in cache.plans(completed):
+            schedule.extend((day, s, a) for s, a in steps)
+            yield from search(new_completed, day + 1)
+            del schedule[len(schedule) - len(steps):]
+
+    yield from search(0, 1)
+
+
+def split_tree(problem, max_days, depth, slack=False):
+    """Expand the top `depth` levels of the dfs / dfs_with_slack tree.
+
+    Yields, in the order the sequential search would reach them, either
+    ("done", schedule) for schedules finished above the cut or
+    ("open", (completed, day, prompt_used, schedule)) for subtrees that
+    still need searching.
+    """
+    N, K = problem.N, problem.K
+    cost, full = problem.cost, problem.full
+
+    def expand(completed, day, prompt_used, schedule, level, ready):
+        if completed == full:
+            yield "done", list(schedule)
+            return
+        if day > max_days:
+            return
+        if problem.hopeless(completed, day, prompt_used, max_days):
+            return
+        if level == depth:
+            yield "open", (completed, day, list(prompt_used), list(schedule))
+            return
+
+        progress = False
+
+        for a in bits(ready):
+            new_completed = completed | (1 << a)
+            new_ready = problem.ready_after(ready, new_completed, a)
+
+            for s in range(N):
+                if prompt_used[s] + cost[a] <= K:
+                    progress = True
+                    prompt_used[s] += cost[a]
+                    schedule.append((day, s, a))
+
+                    yield from expand(new_completed, day, prompt_used,
+                                      schedule, level + 1, new_ready)
+
+                    schedule.pop()
+                    prompt_used[s] -= cost[a]
+
+        if slack or not progress:
+            yield from expand(completed, day + 1, [0] * N, schedule,
+                              level + 1, ready)
+
+    yield from expand(0, 1, [0] * N, [], 0, problem.ready_mask(0))
+
+
+def search_subtree(task):
+    # Schedules are spooled to a file in chunks, so neither the worker nor
+    # the parent ever holds a whole subtree; returns the file's path
+    search, problem, max_days, state, spool_dir = task
+    completed, day, prompt_used, schedule = state
+    fd, path = tempfile.mkstemp(suffix=".pkl", dir=spool_dir)
+    with os.fdopen(fd, "wb") as f:
+        chunk = []
+        for sch in search(problem, completed, day, prompt_used, schedule,
+                          max_days):
+            chunk.append(sch)
+            if len(chunk) == 4096:
+                pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+                chunk = []
+        if chunk:
+            pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def read_spool(path):
+    with open(path, "rb") as f:
+        while True:
+            try:
+                chunk = pickle.load(f)
+            except EOFError:
+                break
+            yield from chunk
+    os.remove(path)
+
+
+def count_subtree(task):
+    problem, max_days, slack, state = task
+    completed, day, prompt_used, _ = state
+    return count_schedules(problem, max_days, slack=slack,
+                           start=(completed, day, prompt_used))
+
+
+def parallel_search(search, problem, max_days, workers, depth, slack=False):
+    """Run `search` (dfs or dfs_with_slack) over a process pool.
+
+    The tree is split at `depth` and every open subtree becomes one task;
+    results are merged back in sequential order, so the stream is the
+    same as a single-process run. Only 2 * workers tasks are in flight at
+    a time, each spooling its schedules to a temporary file.
+    """
+    items = list(split_tree(problem, max_days, depth, slack))
+
+    with tempfile.TemporaryDirectory(prefix="subtrees-") as spool_dir, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        tasks = ((search, problem, max_days, state, spool_dir)
+                 for kind, state in items if kind == "open")
+        window = deque()
+
+        def fill():
+            while len(window) < 2 * workers:
+                task = next(tasks, None)
+                if task is None:
+                    break
+                window.append(pool.submit(search_subtree, task))
+
+        fill()
+        for kind, item in items:
+            if kind == "done":
+                yield item
+            else:
+                path = window.popleft().result()
+                fill()
+                yield from read_spool(path)
+
+
+def parallel_count(problem, max_days, workers, depth, slack=False):
+    items = list(split_tree(problem, max_days, depth, slack))
+    tasks = [(problem, max_days, slack, state)
+             for kind, state in items if kind == "open"]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        total = sum(pool.map(count_subtree, tasks))
+    return total + sum(1 for kind, _ in items if kind == "done")
+
+
+def write_schedules(schedules, problem, arrow="→", out=None, start=0):
+    """Print schedules as they arrive and return how many were written.
+
+    Each schedule is formatted into one string and written in a single
+    call; the first one is flushed straight away so downstream readers do
+    not wait for the buffer to fill. Numbering continues after `start`.
+    """
+    if out is None:
+        out = sys.stdout
+
+    names = problem.names
+    count = start
+
+    for sch in schedules:
+        count += 1
+        lines = [f"Schedule {count}:"]
+        for day, student, a in sch:
+            lines.append(f"  Day {day}: Student {student + 1} {arrow} {names[a]}")
+        lines.append("\n")
+        out.write("\n".join(lines))
+        if count == start + 1:
+            out.flush()
+
+    return count - start
@@ -0,0 +1,77 @@
+class ReadySet:
+    """Assignments whose dependencies are all done, maintained incrementally.
+
+    Every assignment keeps a count of unfinished dependencies and a list of
+    successors, so assign/undo cost O(out-degree) instead of rescanning all
+    dependency lists. Iteration follows input order over a snapshot of the
+    current set, so the set may be changed while iterating.
+    """
+
+    def __init__(self, dependencies, done=()):
+        # dependencies: ordered mapping assignment -> list of dependencies
+        self.keys = list(dependencies)
+        self.index = {a: i for i, a in enumerate(self.keys)}
+        self.deps = [list(dependencies[a]) for a in self.keys]
+
+        self.successors = [[] for _ in self.keys]
+        self.waiting = [0] * len(self.keys)
+        for i, a in enumerate(self.keys):
+            for dep in set(dependencies[a]):
+                # A dependency that is not an assignment is never released
+                if dep in self.index:
+                    self.successors[self.index[dep]].append(i)
+                self.waiting[i] += 1
+
+        self.done = 0
+        self.mask = 0
+        for i, w in enumerate(self.waiting):
+            if w == 0:
+                self.mask |= 1 << i
+
+        for a in done:
+            self.assign(a)
+
+    def assign(self, a):
+        i = self.index[a]
+        bit = 1 << i
+        self.done |= bit
+        self.mask &= ~bit
+        waiting = self.waiting
+        for j in self.successors[i]:
+            waiting[j] -= 1
+            if waiting[j] == 0 and not self.done >> j & 1:
+                self.mask |= 1 << j
+
+    def undo(self, a):
+        i = self.index[a]
+        bit = 1 << i
+        waiting = self.waiting
+        for j in self.successors[i]:
+            if waiting[j] == 0:
+                self.mask &= ~(1 << j)
+            waiting[j] += 1
+        self.done &= ~bit
+        if waiting[i] == 0:
+            self.mask |= bit
+
+    def released(self, a, completed):
+        """Successors of `a` that are ready once `completed` (which already
+        contains `a`) is done; for searches that copy their state instead
+        of calling assign/undo."""
+        keys = self.keys
+        return [keys[j] for j in self.successors[self.index[a]]
+                if all(dep in completed for dep in self.deps[j])]
+
+    def __contains__(self, a):
+        return bool(self.mask >> self.index[a] & 1)
+
+    def __iter__(self):
+        keys = self.keys
+        m = self.mask
+        while m:
+            low = m & -m
+            m ^= low
+            yield keys[low.bit_length() - 1]
+
+    def __len__(self):
+        return bin(self.mask).count("1")
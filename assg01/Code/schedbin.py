@@ -0,0 +1,151 @@
+import mmap
+import struct
+import sys
+from array import array
+
+# Binary schedule file
+#
+#   header   "SCHD", version, field width (1 or 2 bytes), N, A, count
+#   names    A length-prefixed UTF-8 assignment names
+#   records  count schedules, each A steps of (day, student, assignment
+#            index), every field `width` bytes, little-endian
+#
+# Every valid schedule does each assignment exactly once, so records have
+# a fixed size and schedule i is found by offset arithmetic.
+
+MAGIC = b"SCHD"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHHQ")
+
+
+class ScheduleWriter:
+    """Writes schedules (lists of (day, student, index)) to a .bin file."""
+
+    def __init__(self, path, problem, max_days, chunk=4096):
+        self.N = problem.N
+        self.A = problem.A
+        self.width = 1 if max(max_days, problem.N, problem.A) < 256 else 2
+        self.typecode = "B" if self.width == 1 else "H"
+        self.chunk = chunk
+        self.count = 0
+
+        self.f = open(path, "wb")
+        self.f.write(HEADER.pack(MAGIC, VERSION, self.width, self.N, self.A,
+                                 0))
+        for name in problem.names:
+            data = name.encode("utf-8")
+            self.f.write(struct.pack("<H", len(data)) + data)
+        self.buffer = array(self.typecode)
+        self.pending = 0
+
+    def write(self, schedule):
+        if len(schedule) != self.A:
+            raise ValueError("schedule does not cover every assignment")
+        for step in schedule:
+            self.buffer.extend(step)
+        self.count += 1
+        self.pending += 1
+        if self.pending == self.chunk:
+            self._flush()
+
+    def _flush(self):
+        if sys.byteorder == "big":
+            self.buffer.byteswap()
+        self.buffer.tofile(self.f)
+        self.buffer = array(self.typecode)
+        self.pending = 0
+
+    def close(self):
+        self._flush()
+        # The count is only known now, patch it into the header
+        self.f.seek(0)
+        self.f.write(HEADER.pack(MAGIC, VERSION, self.width, self.N, self.A,
+                                 self.count))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_binary(schedules, problem, max_days, path):
+    # Binary counterpart of problem.write_schedules
+    with ScheduleWriter(path, problem, max_days) as writer:
+        for sch in schedules:
+            writer.write(sch)
+    return writer.count
+
+
+class ScheduleReader:
+    """Memory-mapped random access to a file written by ScheduleWriter."""
+
+    def __init__(self, path):
+        self.f = open(path, "rb")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.width, self.N, self.A, self.count = \
+            HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a schedule file")
+
+        offset = HEADER.size
+        self.names = []
+        for _ in range(self.A):
+            (length,) = struct.unpack_from("<H", self.mm, offset)
+            offset += 2
+            self.names.append(self.mm[offset:offset + length].decode("utf-8"))
+            offset += length
+
+        self.data_start = offset
+        self.record = struct.Struct(
+            "<" + str(3 * self.A) + ("B" if self.width == 1 else "H"))
+
+    def __len__(self):
+        return self.count
+
+    def raw(self, i):
+        """Schedule i as (day, student, assignment index) steps."""
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        fields = self.record.unpack_from(self.mm,
+                                         self.data_start + i * self.record.size)
+        return [fields[j:j + 3] for j in range(0, len(fields), 3)]
+
+    def __getitem__(self, i):
+        """Schedule i as (day, student, assignment name) steps."""
+        return [(day, s, self.names[a]) for day, s, a in self.raw(i)]
+
+    def close(self):
+        self.mm.close()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 schedbin.py <schedule-file> [index ...]")
+        print("Indices count from 1, as in the printed schedules")
+        return
+
+    with ScheduleReader(sys.argv[1]) as reader:
+        print(f"Total valid schedules: {len(reader)}\n")
+        indices = [int(i) for i in sys.argv[2:]] or range(1, len(reader) + 1)
+        for i in indices:
+            if not 1 <= i <= len(reader):
+                print(f"Schedule {i}: no such schedule\n")
+                continue
+            print(f"Schedule {i}:")
+            for day, student, assignment in reader[i - 1]:
+                print(f"  Day {day}: Student {student + 1} → {assignment}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
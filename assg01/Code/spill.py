@@ -0,0 +1,79 @@
+import os
+import pickle
+import tempfile
+from collections import deque
+
+
+class SpillQueue:
+    """FIFO queue that keeps at most `limit` entries in memory.
+
+    Entries past the limit are collected in chunks of `chunk` and pickled
+    to a temporary directory; chunks are read back in the order they were
+    written, so popleft() returns entries in exactly the order a deque
+    would.
+    """
+
+    def __init__(self, items=(), limit=100000, chunk=None):
+        self.limit = limit
+        self.chunk = chunk or max(1, limit // 4)
+        self.head = deque()
+        self.tail = []
+        self.files = deque()
+        self.spilled = 0
+        self.count = 0
+        self.dir = None
+        self.next_file = 0
+        for x in items:
+            self.append(x)
+
+    def append(self, x):
+        self.count += 1
+        # Once anything is waiting outside `head`, later entries must queue
+        # behind it
+        if not self.files and not self.tail and len(self.head) < self.limit:
+            self.head.append(x)
+            return
+        self.tail.append(x)
+        if len(self.tail) >= self.chunk:
+            self._spill()
+
+    def _spill(self):
+        if self.dir is None:
+            self.dir = tempfile.TemporaryDirectory(prefix="spill-")
+        path = os.path.join(self.dir.name, f"{self.next_file}.pkl")
+        self.next_file += 1
+        with open(path, "wb") as f:
+            pickle.dump(self.tail, f, pickle.HIGHEST_PROTOCOL)
+        self.spilled += len(self.tail)
+        self.files.append(path)
+        self.tail = []
+
+    def popleft(self):
+        if not self.head:
+            if self.files:
+                path = self.files.popleft()
+                with open(path, "rb") as f:
+                    self.head = deque(pickle.load(f))
+                os.remove(path)
+            elif self.tail:
+                self.head = deque(self.tail)
+                self.tail = []
+            else:
+                raise IndexError("pop from an empty SpillQueue")
+        self.count -= 1
+        return self.head.popleft()
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        if self.dir is not None:
+            self.dir.cleanup()
+            self.dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
@@ -0,0 +1,100 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Batch validation of schedules given as (day, student, assignment index)
+# steps, as produced by the searches on a CompiledProblem. A schedule is
+# valid when it does every assignment exactly once, each one after its
+# dependencies, with at most K prompts per student per day and no day
+# past max_days. With NumPy the whole batch is checked at once, otherwise
+# schedule by schedule on bitmasks.
+
+
+def invalid_schedules(problem, schedules, max_days):
+    """Indices of the schedules in `schedules` that break a rule."""
+    schedules = list(schedules)
+    if np is not None:
+        return _invalid_numpy(problem, schedules, max_days)
+    return [i for i, sch in enumerate(schedules)
+            if not _valid(problem, sch, max_days)]
+
+
+def _valid(problem, schedule, max_days):
+    N, K = problem.N, problem.K
+    cost, dep_mask = problem.cost, problem.dep_mask
+    if problem.impossible and problem.A:
+        return False
+
+    completed = 0
+    usage = {}
+    for day, s, a in schedule:
+        if not 1 <= day <= max_days or not 0 <= s < N:
+            return False
+        if not 0 <= a < problem.A or completed >> a & 1:
+            return False
+        if (completed & dep_mask[a]) != dep_mask[a]:
+            return False
+        used = usage.get((day, s), 0) + cost[a]
+        if used > K:
+            return False
+        usage[(day, s)] = used
+        completed |= 1 << a
+    return completed == problem.full
+
+
+def _invalid_numpy(problem, schedules, max_days):
+    N, K, A = problem.N, problem.K, problem.A
+    B = len(schedules)
+    bad = np.zeros(B, dtype=bool)
+
+    # Only schedules with one step per assignment fit the packed arrays
+    full_length = np.array([len(sch) == A for sch in schedules], dtype=bool)
+    bad |= ~full_length
+    if A == 0 or not full_length.any():
+        return np.flatnonzero(bad).tolist()
+    if problem.impossible:
+        bad[:] = True
+        return np.flatnonzero(bad).tolist()
+
+    rows = np.flatnonzero(full_length)
+    steps = np.array([schedules[i] for i in rows],
+                     dtype=np.int64).reshape(len(rows), A, 3)
+    day, student, asg = steps[:, :, 0], steps[:, :, 1], steps[:, :, 2]
+
+    wrong = ((day < 1) | (day > max_days)).any(axis=1)
+    wrong |= ((student < 0) | (student >= N)).any(axis=1)
+
+    # Exactly once: the sorted assignment indices are 0 .. A-1
+    wrong |= (np.sort(asg, axis=1) != np.arange(A)).any(axis=1)
+
+    # Dependencies: position of every assignment, compared edge by edge
+    ok = ~wrong
+    if ok.any():
+        sub = asg[ok]
+        pos = np.empty_like(sub)
+        np.put_along_axis(pos, sub,
+                          np.broadcast_to(np.arange(A), sub.shape), axis=1)
+        edges = [(a, d) for a in range(A) for d in problem.deps[a]]
+        if edges:
+            after, before = np.array(edges, dtype=np.int64).T
+            late = (pos[:, before] >= pos[:, after]).any(axis=1)
+            idx = np.flatnonzero(ok)
+            wrong[idx[late]] = True
+
+    # Prompt cap: prompts summed per (schedule, day, student)
+    ok = ~wrong
+    if ok.any():
+        cost = np.array(problem.cost, dtype=np.int64)
+        cells = max_days * N
+        d, s, a = day[ok], student[ok], asg[ok]
+        slot = (np.arange(len(d))[:, None] * cells + (d - 1) * N + s)
+        used = np.bincount(slot.ravel(), weights=cost[a].ravel(),
+                           minlength=len(d) * cells).reshape(len(d), cells)
+        over = (used > K).any(axis=1)
+        idx = np.flatnonzero(ok)
+        wrong[idx[over]] = True
+
+    bad[rows[wrong]] = True
+    return np.flatnonzero(bad).tolist()
@@ -1,7 +1,12 @@
 import sys
-from collections import deque
 from copy import deepcopy
 
+from common import (K_bounds, SearchStats, compile_masks, critical_path,
+                    greedy_days_delayed, minimum_K_delayed, over_budget,
+                    remember, smallest_feasible_K)
+from readyset import ReadySet
+from spill import DayLayerFronts, DayLayerVisited, SpillQueue
+
 def parse_input(filename):
     assig = {}
     dependencies = {}
@@ -31,212 +36,512 @@ def deps_satisfied_local(a, local_knowledge, dependencies):
     return all(dep in local_knowledge for dep in dependencies[a])
 
 
-def earliest_completion(assg, dependencies, N, K):
-    initial = (frozenset(), 1, tuple([0]*N))
-    queue = deque([initial])
-    visited = set()
-
-    while queue:
-        completed, day, prompts = queue.popleft()
-
-        if completed == frozenset(assg.keys()):
-            return day
-
-        if (completed, day, prompts) in visited:
-            continue
-        visited.add((completed, day, prompts))
-
-        progress = False
-
-        for a in assg:
-            if a in completed:
-                continue
-            if not all(dep in completed for dep in dependencies[a]):
-                continue
-
-            for s in range(N):
-                if prompts[s] + assg[a] <= K:
-                    progress = True
-                    new_completed = set(completed)
-                    new_completed.add(a)
-
-                    new_prompts = list(prompts)
-                    new_prompts[s] += assg[a]
-
-                    queue.append((
-                        frozenset(new_completed),
-                        day,
-                        tuple(new_prompts)
-                    ))
-
-        if not progress:
-            queue.append((completed, day + 1, tuple([0]*N)))
-
-    return None
-
-
-
-def can_finish(assig, dependencies, N, K, maxDays):
-
-    def dfs(completed, day, prompts):
-        if completed == set(assig.keys()):
-            return True
-        if day > maxDays:
-            return False
-
-        progress = False
-
-        for a in assig:
-            if a in completed:
-                continue
-            if not all(dep in completed for dep in dependencies[a]):
-                continue
+def dominates(u, v):
+    # Sorted usage u is componentwise no larger than v: a state using u can
+    # do everything a state using v can
+    return all(x <= y for x, y in zip(u, v))
 
-            for s in range(N):
-                if prompts[s] + assig[a] <= K:
-                    progress = True
-                    completed.add(a)
-                    prompts[s] += assig[a]
 
-                    if dfs(completed, day, prompts):
-                        return True
+def earliest_completion(assg, dependencies, N, K, mem_states=200000,
+                        max_day=None):
+    rs = ReadySet(dependencies)
+    initial = (frozenset(), 1, tuple([0]*N), frozenset(rs))
 
-                    prompts[s] -= assig[a]
-                    completed.remove(a)
+    # archive holds, per day and completed set, the usage vectors not
+    # dominated by another queued or expanded state; it also does the job
+    # of a visited set. Past mem_states the queue and the archive's
+    # largest day layers go to temporary files.
+    def encode(completed):
+        return " ".join(sorted(completed))
 
-        if not progress:
-            return dfs(completed, day + 1, [0]*N)
+    with SpillQueue([initial], mem_states) as queue, \
+            DayLayerFronts(encode, dominates, mem_states) as archive:
+        archive.admit(1, initial[0], initial[2])
+        pending = {1: 1}
 
-        return False
+        def push(state):
+            if archive.admit(state[1], state[0], state[2]):
+                queue.append(state)
+                pending[state[1]] = pending.get(state[1], 0) + 1
 
-    return dfs(set(), 1, [0]*N)
+        while queue:
+            completed, day, prompts, ready = queue.popleft()
+            pending[day] -= 1
 
+            if len(completed) == len(assg):
+                return day
 
+            # Skip states evicted by a dominating one since they were queued
+            if archive.holds(day, completed, prompts):
+                progress = False
 
-def minimum_K(assignments, dependencies, N, max_days):
-    K = 1
-    while True:
-        if can_finish(assignments, dependencies, N, K, max_days):
-            return K
-        K += 1
+                for a in ready:
+                    new_completed = completed | {a}
+                    new_ready = (ready - {a}).union(rs.released(a, new_completed))
 
+                    for s in range(N):
+                        if prompts[s] + assg[a] <= K:
+                            progress = True
 
+                            new_prompts = list(prompts)
+                            new_prompts[s] += assg[a]
 
-def earliest_completion_delayed(assig, dependencies, N, K):
-    init_knowledge = tuple(frozenset() for _ in range(N))
-    initial = (frozenset(), 1, tuple([0]*N), init_knowledge)
+                            # Students are interchangeable: keep usage
+                            # sorted so permuted states coincide
+                            push((
+                                new_completed,
+                                day,
+                                tuple(sorted(new_prompts)),
+                                new_ready
+                            ))
 
-    queue = deque([initial])
-    visited = set()
+                if not progress and (max_day is None or day < max_day):
+                    push((completed, day + 1, tuple([0]*N), ready))
 
-    while queue:
-        completed, day, prompts, knowledge = queue.popleft()
+            # No queued state is older than this day any more
+            if pending[day] == 0:
+                del pending[day]
+                if pending:
+                    archive.drop_before(min(pending))
 
-        if completed == frozenset(assig.keys()):
-            return day
+    return None
 
-        state_id = (completed, day, prompts, knowledge)
-        if state_id in visited:
-            continue
-        visited.add(state_id)
 
-        progress = False
 
-        for a in assig:
-            if a in completed:
+def earliest_completion_layered(assg, dependencies, N, K, max_day=None):
+    # Same answer as earliest_completion, but only the completed sets at
+    # day boundaries are kept: layer d holds every bitmask of assignments
+    # that can be done when day d starts. Each one is expanded with all of
+    # its maximal day plans (a day ends only when nothing more fits),
+    # memoized per bitmask, and the next layer is deduplicated.
+    cost, need, full = compile_masks(assg, dependencies)
+    A = len(cost)
+    plans = {}
+
+    def day_ends(start):
+        # Completed sets a day starting from `start` can end with
+        if start in plans:
+            return plans[start]
+        ends = set()
+        seen = set()
+        stack = [(start, tuple([0]*N))]
+        while stack:
+            state = stack.pop()
+            if state in seen:
                 continue
+            seen.add(state)
+            completed, prompts = state
 
-            for s in range(N):
-                if not deps_satisfied_local(a, knowledge[s], dependencies):
+            moved = False
+            for i in range(A):
+                if completed >> i & 1 or need[i] & ~completed:
                     continue
-                if prompts[s] + assig[a] <= K:
-                    progress = True
-
-                    new_completed = set(completed)
-                    new_completed.add(a)
-
-                    new_prompts = list(prompts)
-                    new_prompts[s] += assig[a]
-
-                    new_knowledge = [set(k) for k in knowledge]
-                    new_knowledge[s].add(a)
-
-                    queue.append((
-                        frozenset(new_completed),
-                        day,
-                        tuple(new_prompts),
-                        tuple(frozenset(k) for k in new_knowledge)
-                    ))
-
-        if not progress:
-            shared = set(completed)
-            new_knowledge = tuple(frozenset(shared) for _ in range(N))
-            queue.append((
-                completed,
-                day + 1,
-                tuple([0]*N),
-                new_knowledge
-            ))
+                for s in range(N):
+                    # Usage is kept sorted, equal students are the same
+                    if s > 0 and prompts[s] == prompts[s - 1]:
+                        continue
+                    if prompts[s] + cost[i] <= K:
+                        moved = True
+                        new_prompts = list(prompts)
+                        new_prompts[s] += cost[i]
+                        stack.append((completed | 1 << i,
+                                      tuple(sorted(new_prompts))))
+            if not moved:
+                ends.add(completed)
+
+        plans[start] = ends
+        return ends
+
+    layer = {0}
+    day = 1
+    while layer and (max_day is None or day <= max_day):
+        if full in layer:
+            return day
+        next_layer = set()
+        for completed in layer:
+            for end in day_ends(completed):
+                if end == full:
+                    return day
+                # A day without progress would repeat forever
+                if end != completed:
+                    next_layer.add(end)
+        layer = next_layer
+        day += 1
 
     return None
 
 
 
+def day_lower_bound(assig, dependencies, N, K, delayed=False):
+    # Every prompt has to fit into N * K per day. With delayed sharing a
+    # dependency chain also moves on within a day only if the same student
+    # carries on, so each assignment gets the earliest (day, prompts that
+    # student has used) any chain to it allows.
+    total = sum(assig.values())
+    lo = max(1, -(-total // (N*K))) if N > 0 and K > 0 else 1
+    if not delayed:
+        return lo
+
+    ready = ReadySet(dependencies)
+    earliest = {}
+    while len(ready):
+        for a in ready:
+            ready.assign(a)
+            at = (1, 0)
+            for dep in dependencies[a]:
+                d, used = earliest[dep]
+                at = max(at, (d, used) if used + assig[a] <= K else (d + 1, 0))
+            earliest[a] = (at[0], at[1] + assig[a])
+            lo = max(lo, at[0])
+    return lo
+
+
+def bounded_earliest_day(assig, dependencies, N, K, search, delayed=False,
+                         known_hi=None):
+    # Greedy upper bound and analytic lower bound first; the exact
+    # `search(max_day)` only runs when they differ, and only looks at days
+    # below the greedy answer (or known_hi, a day K is known to meet)
+    greedy = greedy_days_delayed if delayed else greedy_days
+    hi = greedy(assig, dependencies, N, K)
+    if hi is None:
+        # Even a fresh day cannot start anything
+        return None
+    if known_hi is not None:
+        hi = min(hi, known_hi)
+    lo = day_lower_bound(assig, dependencies, N, K, delayed)
+    if lo >= hi:
+        return hi
+    found = search(hi - 1)
+    return hi if found is None else found
+
+
+def can_finish_iterative(assig, dependencies, N, K, maxDays,
+                         node_budget=None, stats=None, table=None):
+    # Depth-first search for a schedule that finishes within maxDays, on
+    # an explicit frame stack instead of recursion. Each frame holds the
+    # moves of one node ((assignment, student), or None for "next day")
+    # and the index of the next one to try. Returns None if `node_budget`
+    # runs out before an answer is found. `table` keeps
+    # what was learnt about states between calls for different K (same
+    # instance, N and maxDays).
+    if stats is None:
+        stats = SearchStats()
+
+    ready = ReadySet(dependencies)
+    completed = set()
+    day = 1
+    prompts = [0]*N
+
+    stack = []
+    entering = True
 
-
-def can_finish_delayed(assigs, dependencies, N, K, max_days):
-
-    def dfs(completed, day, prompts, knowledge):
-        if completed == set(assigs.keys()):
-            return True
-        if day > max_days:
+    while True:
+        if entering:
+            entering = False
+            if over_budget(stats, node_budget):
+                return None
+            if len(completed) == len(assig):
+                if table is not None:
+                    for frame in stack:
+                        remember(table, frame[3], K, True)
+                return True
+            key = None
+            known = None
+            if table is not None and day <= maxDays:
+                key = (frozenset(completed), day, tuple(prompts))
+                known = table.get(key)
+                if known is not None and known[1] is not None \
+                        and known[1] <= K:
+                    for frame in stack:
+                        remember(table, frame[3], K, True)
+                    return True
+            if day <= maxDays and (known is None or known[0] < K):
+                moves = [(a, s) for a in ready for s in range(N)
+                         if prompts[s] + assig[a] <= K]
+                if not moves:
+                    moves.append(None)
+                stack.append([moves, 0, None, key])
+
+        if not stack:
             return False
 
-        progress = False
-
-        for a in assigs:
-            if a in completed:
-                continue
-
-            for s in range(N):
-                if not deps_satisfied_local(a, knowledge[s], dependencies):
-                    continue
-                if prompts[s] + assigs[a] <= K:
-                    progress = True
-
-                    completed.add(a)
-                    prompts[s] += assigs[a]
-                    knowledge[s].add(a)
-
-                    if dfs(completed, day, prompts, knowledge):
-                        return True
-
-                    knowledge[s].remove(a)
-                    prompts[s] -= assigs[a]
-                    completed.remove(a)
+        frame = stack[-1]
+        moves, i, saved = frame[:3]
+
+        if i > 0:
+            move = moves[i - 1]
+            if move is None:
+                day -= 1
+                prompts = saved
+            else:
+                a, s = move
+                prompts[s] -= assig[a]
+                completed.remove(a)
+                ready.undo(a)
+
+        if i == len(moves):
+            stack.pop()
+            if table is not None:
+                remember(table, frame[3], K, False)
+            continue
 
+        move = moves[i]
+        frame[1] = i + 1
+        if move is None:
+            frame[2] = prompts
+            prompts = [0]*N
+            day += 1
+        else:
+            a, s = move
+            ready.assign(a)
+            completed.add(a)
+            prompts[s] += assig[a]
+        entering = True
+
+
+
+def greedy_days(assig, dependencies, N, K):
+    # List scheduling with instant sharing: each day, ready assignments
+    # (longest critical path first) go to the student with the most
+    # prompts left, until nothing fits. Returns the day the greedy
+    # schedule finishes, or None if it gets stuck.
+    path = critical_path(assig, dependencies)
+    ready = ReadySet(dependencies)
+    done = 0
+    day = 0
+
+    while done < len(assig):
+        day += 1
+        left = [K]*N
+        progress = False
+        placed = True
+        while placed:
+            placed = False
+            for a in sorted(ready, key=lambda a: -path[a]):
+                s = max(range(N), key=lambda s: left[s])
+                if assig[a] <= left[s]:
+                    left[s] -= assig[a]
+                    ready.assign(a)
+                    done += 1
+                    placed = progress = True
         if not progress:
-            shared = set(completed)
-            new_knowledge = [shared.copy() for _ in range(N)]
-            return dfs(completed, day + 1, [0]*N, new_knowledge)
-
-        return False
-
-    return dfs(set(), 1, [0]*N, [set() for _ in range(N)])
+            return None
+
+    # Nothing to do still takes the first day
+    return max(day, 1)
+
+
+def minimum_K(assignments, dependencies, N, max_days, node_budget=None,
+              stats=None, known_lo=None, known_hi=None):
+    # known_lo: a lower bound on the answer, known_hi: a K known to be
+    # feasible for these days
+    table = {}
+
+    def feasible(K):
+        return can_finish_iterative(assignments, dependencies, N, K,
+                                    max_days, node_budget, stats, table)
+
+    lo, hi = K_bounds(assignments, N, max_days,
+                      lambda K: greedy_days(assignments, dependencies, N, K),
+                      known_lo)
+    if known_hi is not None and (hi is None or known_hi < hi):
+        hi = known_hi
+    if hi is None:
+        # Nothing cheaper to go on: try with every prompt available
+        hi = max(lo, sum(assignments.values()))
+        if not feasible(hi):
+            return None
+    return smallest_feasible_K(lo, hi, feasible)
+
+
+
+def earliest_completion_delayed(assig, dependencies, N, K, mem_states=200000,
+                                max_day=None):
+    # A student knows what was shared at the start of the day plus their
+    # own work of today, so a state is the shared bitmask, one bitmask of
+    # today's work per student and the prompts used
+    cost, need, full = compile_masks(assig, dependencies)
+    A = len(cost)
+    initial = (0, 1, tuple([0]*N), tuple([0]*N))
+
+    with SpillQueue([initial], mem_states) as queue, \
+            DayLayerVisited(repr, mem_states) as visited:
+        pending = {1: 1}
+
+        def push(state):
+            queue.append(state)
+            pending[state[1]] = pending.get(state[1], 0) + 1
+
+        while queue:
+            shared, day, prompts, today = queue.popleft()
+            pending[day] -= 1
+
+            completed = shared
+            for t in today:
+                completed |= t
+
+            if completed == full:
+                return day
+
+            if visited.add(day, (shared, prompts, today)):
+                progress = False
+
+                for a in range(A):
+                    if completed >> a & 1:
+                        continue
+
+                    for s in range(N):
+                        if need[a] & ~(shared | today[s]):
+                            continue
+                        # Students are kept sorted by (usage, today's
+                        # work), so equal neighbours are the same move
+                        if s > 0 and prompts[s] == prompts[s - 1] \
+                                and today[s] == today[s - 1]:
+                            continue
+                        if prompts[s] + cost[a] <= K:
+                            progress = True
+
+                            new_prompts = list(prompts)
+                            new_prompts[s] += cost[a]
+
+                            new_today = list(today)
+                            new_today[s] |= 1 << a
+
+                            pairs = sorted(zip(new_prompts, new_today))
+
+                            push((
+                                shared,
+                                day,
+                                tuple(u for u, _ in pairs),
+                                tuple(t for _, t in pairs)
+                            ))
+
+                if not progress and (max_day is None or day < max_day):
+                    push((completed, day + 1, tuple([0]*N), tuple([0]*N)))
+
+            if pending[day] == 0:
+                del pending[day]
+                if pending:
+                    visited.drop_before(min(pending))
 
+    return None
 
 
+def frontier(assigs, dependencies, N, earliest, minimum):
+    # Staircase of (K, earliest day): from the smallest usable K, each
+    # step is the least K that finishes a day sooner than the last one.
+    # Neighbouring points bound each other: the next K is searched above
+    # the current one, and its earliest day is at most the day it was
+    # found for. Returns None if a search runs out of node budget.
+    K = max([1] + list(assigs.values()))
+    day = earliest(K, None)
+    if day is None:
+        return []
+    steps = [(K, day)]
+
+    while day > 1:
+        K = minimum(day - 1, K + 1)
+        if K is None:
+            return None
+        day = earliest(K, day - 1)
+        steps.append((K, day))
+
+    return steps
+
+
+def sharing_frontier(assigs, dependencies, N, delayed, node_budget=None,
+                     stats=None):
+    if delayed:
+        search, minimum_fn = earliest_completion_delayed, minimum_K_delayed
+    else:
+        search, minimum_fn = earliest_completion_layered, minimum_K
+
+    def earliest(K, known_hi):
+        return bounded_earliest_day(
+            assigs, dependencies, N, K,
+            lambda d: search(assigs, dependencies, N, K, max_day=d),
+            delayed, known_hi)
+
+    def minimum(days, known_lo):
+        return minimum_fn(assigs, dependencies, N, days, node_budget, stats,
+                          known_lo)
+
+    return frontier(assigs, dependencies, N, earliest, minimum)
+
+
+def print_frontier(instant, delayed):
+    # One row per K where either staircase steps down
+    print(f"{'K':>6} {'instant':>8} {'delayed':>8}")
+    for K in sorted({k for k, _ in instant} | {k for k, _ in delayed}):
+        row = []
+        for steps in (instant, delayed):
+            days = [d for k, d in steps if k <= K]
+            row.append(str(days[-1]) if days else "-")
+        print(f"{K:>6} {row[0]:>8} {row[1]:>8}")
+
+
+def sweep_minimum_K(Ns, minimum):
+    # Minimum K for every N in Ns (ascending). It never grows with N, so
+    # the ends are solved first and every N in between is bounded by its
+    # nearest solved neighbours: minimum(N, known_lo, known_hi) is skipped
+    # altogether when they agree. Returns None if a search gives up.
+    result = {}
+
+    def solve(N, lo, hi):
+        if lo is not None and lo == hi:
+            return lo
+        return minimum(N, lo, hi)
+
+    first, last = Ns[0], Ns[-1]
+    result[first] = solve(first, None, None)
+    if result[first] is None:
+        return None
+    result[last] = solve(last, None, result[first])
+    if result[last] is None:
+        return None
+
+    ranges = [(0, len(Ns) - 1)]
+    while ranges:
+        i, j = ranges.pop()
+        if j - i < 2:
+            continue
+        m = (i + j) // 2
+        K = solve(Ns[m], result[Ns[j]], result[Ns[i]])
+        if K is None:
+            return None
+        result[Ns[m]] = K
+        ranges += [(i, m), (m, j)]
 
+    return [result[N] for N in Ns]
 
-def minimum_K_delayed(assigs, dependencies, N, maxDays):
-    K = 1
-    while True:
-        if can_finish_delayed(assigs, dependencies, N, K, maxDays):
-            return K
-        K += 1
 
 def main():
-    if len(sys.argv) < 4:
+    # Optional flags, anywhere on the command line:
+    #   --node-budget <n>  stop a part2/part3b search after n nodes
+    #   --stats            print nodes expanded and nodes/sec on stderr
+    #   --bfs              part1: search state by state (earliest_completion)
+    #                      instead of day by day
+    #   --mem-states <n>   part1 --bfs / part3a: states kept in memory
+    #                      before the queue and visited set spill to disk
+    argv = list(sys.argv)
+    show_stats = "--stats" in argv
+    if show_stats:
+        argv.remove("--stats")
+    node_budget = None
+    if "--node-budget" in argv:
+        i = argv.index("--node-budget")
+        node_budget = int(argv[i + 1])
+        del argv[i:i + 2]
+    use_bfs = "--bfs" in argv
+    if use_bfs:
+        argv.remove("--bfs")
+    mem_states = 200000
+    if "--mem-states" in argv:
+        i = argv.index("--mem-states")
+        mem_states = int(argv[i + 1])
+        del argv[i:i + 2]
+
+    if len(argv) < 4:
         print("Usage:")
         print("python assg02.py <input-file> <mode> <params>")
         print("Modes:")
@@ -244,10 +549,14 @@ def main():
         print("  part2 <N> <days>")
         print("  part3a <N> <K>")
         print("  part3b <N> <days>")
+        print("  frontier <N>")
+        print("  sweep <N from> <N to> <days>")
+        print("Options: --node-budget <n>, --stats, --mem-states <n>, --bfs")
         return
 
-    filename = sys.argv[1]
-    mode = sys.argv[2]
+    filename = argv[1]
+    mode = argv[2]
+    stats = SearchStats()
 
     assigs, dependencies = parse_input(filename)
     max_cost = 0
@@ -257,35 +566,95 @@ def main():
     
 
     if mode == "part1":
-        N, K = int(sys.argv[3]), int(sys.argv[4])
+        N, K = int(argv[3]), int(argv[4])
 
         if K < max_cost:
             print("Earliest completion day: Infinity")
             return
-        print("Earliest completion day:", earliest_completion(assigs, dependencies, N, K))
+        if use_bfs:
+            search = lambda d: earliest_completion(assigs, dependencies, N, K,
+                                                   mem_states, d)
+        else:
+            search = lambda d: earliest_completion_layered(assigs, dependencies,
+                                                           N, K, d)
+        res = bounded_earliest_day(assigs, dependencies, N, K, search)
+        print("Earliest completion day:", res)
 
     elif mode == "part2":
-        N, days = int(sys.argv[3]), int(sys.argv[4])
-        print("Minimum prompts per student per day:", minimum_K(assigs, dependencies, N, days))
+        N, days = int(argv[3]), int(argv[4])
+        res = minimum_K(assigs, dependencies, N, days, node_budget, stats)
+        if stats.exhausted:
+            print("Result: node budget exhausted")
+        elif res is None:
+            print("Result: IMPOSSIBLE within given days")
+        else:
+            print("Minimum prompts per student per day:", res)
 
     elif mode == "part3a":
-        N, K = int(sys.argv[3]), int(sys.argv[4])
+        N, K = int(argv[3]), int(argv[4])
         if K < max_cost:
             print("Earliest completion day (delayed sharing): Infinity")
             return
-        res = earliest_completion_delayed(assigs, dependencies, N, K)
+        search = lambda d: earliest_completion_delayed(assigs, dependencies,
+                                                       N, K, mem_states, d)
+        res = bounded_earliest_day(assigs, dependencies, N, K, search,
+                                   delayed=True)
         print("Earliest completion day (delayed sharing):", res)
 
     elif mode == "part3b":
-        N, days = int(sys.argv[3]), int(sys.argv[4])
-        res = minimum_K_delayed(assigs, dependencies, N, days)
-        if res is None:
+        N, days = int(argv[3]), int(argv[4])
+        res = minimum_K_delayed(assigs, dependencies, N, days, node_budget,
+                                stats)
+        if stats.exhausted:
+            print("Result: node budget exhausted")
+        elif res is None:
             print("Result: IMPOSSIBLE within given days")
         else:
             print("Minimum prompts per student per day (delayed sharing):", res)
 
+    elif mode == "frontier":
+        N = int(argv[3])
+        steps = [sharing_frontier(assigs, dependencies, N, delayed,
+                                  node_budget, stats)
+                 for delayed in (False, True)]
+        if stats.exhausted:
+            print("Result: node budget exhausted")
+        elif not all(steps):
+            # No K at all lets the assignments be finished
+            print("Result: IMPOSSIBLE for every K")
+        else:
+            print(f"Earliest completion day by K (N = {N}):")
+            print_frontier(*steps)
+
+    elif mode == "sweep":
+        Ns = list(range(int(argv[3]), int(argv[4]) + 1))
+        days = int(argv[5])
+        if not Ns:
+            print("Empty range of N: <N from> must not exceed <N to>")
+            return
+        columns = []
+        for minimum_fn in (minimum_K, minimum_K_delayed):
+            def minimum(N, lo, hi, m=minimum_fn):
+                return m(assigs, dependencies, N, days, node_budget, stats,
+                         lo, hi)
+            columns.append(sweep_minimum_K(Ns, minimum))
+        if stats.exhausted:
+            print("Result: node budget exhausted")
+        elif None in columns:
+            print("Result: IMPOSSIBLE within given days")
+        else:
+            print(f"Minimum prompts per student per day ({days} days):")
+            print(f"{'N':>4} {'instant':>8} {'delayed':>8}")
+            for N, inst, dl in zip(Ns, *columns):
+                print(f"{N:>4} {inst:>8} {dl:>8}")
+
     else:
         print("Invalid mode")
+        return
+
+    # Only part2 / part3b count nodes
+    if stats.nodes and (show_stats or stats.exhausted):
+        print(stats.report(), file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,287 @@
+import time
+
+from readyset import ReadySet
+
+# Shared by assg02.py and delayed.py: search statistics, the greedy
+# schedules, the bounds the minimum-K searches start from and the
+# delayed-sharing minimum-K search itself.
+
+
+class SearchStats:
+    """Node count and throughput of a search, filled in as it runs."""
+
+    def __init__(self):
+        self.nodes = 0
+        self.exhausted = False
+        self.start = time.perf_counter()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def nodes_per_sec(self):
+        elapsed = self.elapsed()
+        return self.nodes / elapsed if elapsed > 0 else 0.0
+
+    def report(self):
+        text = f"Nodes expanded: {self.nodes} ({self.nodes_per_sec():.0f} nodes/sec)"
+        if self.exhausted:
+            text += ", node budget exhausted"
+        return text
+
+
+def over_budget(stats, node_budget):
+    if node_budget is not None and stats.nodes >= node_budget:
+        stats.exhausted = True
+        return True
+    stats.nodes += 1
+    return False
+
+
+def compile_masks(assg, dependencies):
+    # Assignments as bit positions (input order): their costs, the mask of
+    # their dependencies and the mask of all of them
+    names = list(assg)
+    index = {a: i for i, a in enumerate(names)}
+    cost = [assg[a] for a in names]
+
+    need = []
+    for a in names:
+        m = 0
+        for dep in dependencies[a]:
+            # A missing dependency can never be met
+            m |= 1 << index.get(dep, len(names))
+        need.append(m)
+
+    return cost, need, (1 << len(names)) - 1
+
+
+def remember(table, key, K, ok):
+    # table[key] = [largest K the state failed at, smallest K it succeeded
+    # at]. A state that fails at K fails at every smaller K, one that
+    # succeeds at K succeeds at every larger K.
+    entry = table.get(key)
+    if entry is None:
+        entry = table[key] = [0, None]
+    if ok:
+        if entry[1] is None or K < entry[1]:
+            entry[1] = K
+    elif K > entry[0]:
+        entry[0] = K
+
+
+def critical_path(assig, dependencies):
+    # Prompts on the longest dependency chain starting at each assignment
+    # (its own cost included); assignments on a cycle get 0
+    ready = ReadySet(dependencies)
+    order = []
+    while len(ready):
+        for a in ready:
+            ready.assign(a)
+            order.append(a)
+
+    successors = {a: [] for a in assig}
+    for a in assig:
+        for dep in dependencies[a]:
+            if dep in successors:
+                successors[dep].append(a)
+
+    path = {a: 0 for a in assig}
+    for a in reversed(order):
+        path[a] = assig[a] + max([path[b] for b in successors[a]] + [0])
+    return path
+
+
+def greedy_days_delayed(assigs, dependencies, N, K):
+    # List scheduling with delayed sharing: each day, assignments (longest
+    # critical path first) go to the student with the most prompts left
+    # among those who can build on what was shared at the start of the day
+    # and on their own work of today. Returns the day the greedy schedule
+    # finishes, or None if it gets stuck.
+    path = critical_path(assigs, dependencies)
+    order = sorted(assigs, key=lambda a: -path[a])
+    completed = set()
+    day = 0
+
+    while len(completed) < len(assigs):
+        day += 1
+        left = [K]*N
+        knowledge = [set(completed) for _ in range(N)]
+        progress = False
+        placed = True
+        while placed:
+            placed = False
+            for a in order:
+                if a in completed:
+                    continue
+                able = [s for s in range(N)
+                        if all(dep in knowledge[s] for dep in dependencies[a])
+                        and assigs[a] <= left[s]]
+                if able:
+                    s = max(able, key=lambda s: left[s])
+                    left[s] -= assigs[a]
+                    knowledge[s].add(a)
+                    completed.add(a)
+                    placed = progress = True
+        if not progress:
+            return None
+
+    return max(day, 1)
+
+
+def K_bounds(assig, N, days, greedy, known_lo=None):
+    # lo: an assignment cannot be split, and all prompts must fit into
+    # N * days student-days (or known_lo, if that is larger). hi: the first
+    # K, doubling from lo, at which greedy(K) meets the deadline, or None
+    # if it never does.
+    total = sum(assig.values())
+    lo = max([1] + list(assig.values()))
+    if N > 0 and days > 0:
+        lo = max(lo, -(-total // (N*days)))
+    if known_lo is not None:
+        lo = max(lo, known_lo)
+
+    K = lo
+    while True:
+        d = greedy(K)
+        if d is not None and d <= days:
+            return lo, K
+        if K >= total:
+            return lo, None
+        K = min(2*K, total)
+
+
+def smallest_feasible_K(lo, hi, feasible):
+    # Feasibility is monotone in K and hi is known to be feasible
+    while lo < hi:
+        mid = (lo + hi) // 2
+        found = feasible(mid)
+        if found is None:
+            return None
+        if found:
+            hi = mid
+        else:
+            lo = mid + 1
+    return hi
+
+
+def can_finish_delayed_iterative(assignments, dependencies, N, K, max_days,
+                                 node_budget=None, stats=None, table=None):
+    # Depth-first search for a delayed-sharing schedule that finishes
+    # within max_days, on an explicit frame stack. Each frame holds the
+    # moves of one node ((assignment, student), or None for "next day")
+    # and the index of the next one to try. Returns None if `node_budget`
+    # runs out before an answer is found. `table` keeps what was learnt
+    # about states between calls for different K (same instance, N and
+    # max_days).
+    if stats is None:
+        stats = SearchStats()
+
+    cost, need, full = compile_masks(assignments, dependencies)
+    A = len(cost)
+
+    completed = 0
+    day = 1
+    prompts = [0] * N
+    shared_knowledge = 0
+    solved_today = [0] * N
+
+    stack = []
+    entering = True
+
+    while True:
+        if entering:
+            entering = False
+            if over_budget(stats, node_budget):
+                return None
+            if completed == full:
+                if table is not None:
+                    for frame in stack:
+                        remember(table, frame[3], K, True)
+                return True
+            key = None
+            known = None
+            if table is not None and day <= max_days:
+                # completed is shared_knowledge plus today's work
+                key = (day, tuple(prompts), shared_knowledge,
+                       tuple(solved_today))
+                known = table.get(key)
+                if known is not None and known[1] is not None \
+                        and known[1] <= K:
+                    for frame in stack:
+                        remember(table, frame[3], K, True)
+                    return True
+            if day <= max_days and (known is None or known[0] < K):
+                moves = []
+                for a in range(A):
+                    if completed >> a & 1:
+                        continue
+                    for s in range(N):
+                        if need[a] & ~(shared_knowledge | solved_today[s]):
+                            continue
+                        if prompts[s] + cost[a] <= K:
+                            moves.append((a, s))
+                if not moves:
+                    moves.append(None)
+                stack.append([moves, 0, None, key])
+
+        if not stack:
+            return False
+
+        frame = stack[-1]
+        moves, i, saved = frame[:3]
+
+        if i > 0:
+            move = moves[i - 1]
+            if move is None:
+                day -= 1
+                prompts, shared_knowledge, solved_today = saved
+            else:
+                a, s = move
+                solved_today[s] &= ~(1 << a)
+                prompts[s] -= cost[a]
+                completed &= ~(1 << a)
+
+        if i == len(moves):
+            stack.pop()
+            if table is not None:
+                remember(table, frame[3], K, False)
+            continue
+
+        move = moves[i]
+        frame[1] = i + 1
+        if move is None:
+            # Advance day → share knowledge
+            frame[2] = (prompts, shared_knowledge, solved_today)
+            prompts = [0] * N
+            shared_knowledge = completed
+            solved_today = [0] * N
+            day += 1
+        else:
+            a, s = move
+            completed |= 1 << a
+            prompts[s] += cost[a]
+            solved_today[s] |= 1 << a
+        entering = True
+
+
+def minimum_K_delayed(assigs, dependencies, N, maxDays, node_budget=None,
+                      stats=None, known_lo=None, known_hi=None):
+    # known_lo: a lower bound on the answer, known_hi: a K known to be
+    # feasible for these days
+    table = {}
+
+    def feasible(K):
+        return can_finish_delayed_iterative(assigs, dependencies, N, K,
+                                            maxDays, node_budget, stats,
+                                            table)
+
+    lo, hi = K_bounds(assigs, N, maxDays,
+                      lambda K: greedy_days_delayed(assigs, dependencies, N, K),
+                      known_lo)
+    if known_hi is not None and (hi is None or known_hi < hi):
+        hi = known_hi
+    if hi is None:
+        hi = max(lo, sum(assigs.values()))
+        if not feasible(hi):
+            return None
+    return smallest_feasible_K(lo, hi, feasible)
@@ -0,0 +1,254 @@
+import os
+import pickle
+import sqlite3
+import tempfile
+from collections import deque
+
+
+class SpillQueue:
+    """FIFO queue that keeps at most `limit` entries in memory.
+
+    Entries past the limit are collected in chunks of `chunk` and pickled
+    to a temporary directory; chunks are read back in the order they were
+    written, so popleft() returns entries in exactly the order a deque
+    would.
+    """
+
+    def __init__(self, items=(), limit=100000, chunk=None):
+        self.limit = limit
+        self.chunk = chunk or max(1, limit // 4)
+        self.head = deque()
+        self.tail = []
+        self.files = deque()
+        self.spilled = 0
+        self.count = 0
+        self.dir = None
+        self.next_file = 0
+        for x in items:
+            self.append(x)
+
+    def append(self, x):
+        self.count += 1
+        # Once anything is waiting outside `head`, later entries must queue
+        # behind it
+        if not self.files and not self.tail and len(self.head) < self.limit:
+            self.head.append(x)
+            return
+        self.tail.append(x)
+        if len(self.tail) >= self.chunk:
+            self._spill()
+
+    def _spill(self):
+        if self.dir is None:
+            self.dir = tempfile.TemporaryDirectory(prefix="spill-")
+        path = os.path.join(self.dir.name, f"{self.next_file}.pkl")
+        self.next_file += 1
+        with open(path, "wb") as f:
+            pickle.dump(self.tail, f, pickle.HIGHEST_PROTOCOL)
+        self.spilled += len(self.tail)
+        self.files.append(path)
+        self.tail = []
+
+    def popleft(self):
+        if not self.head:
+            if self.files:
+                path = self.files.popleft()
+                with open(path, "rb") as f:
+                    self.head = deque(pickle.load(f))
+                os.remove(path)
+            elif self.tail:
+                self.head = deque(self.tail)
+                self.tail = []
+            else:
+                raise IndexError("pop from an empty SpillQueue")
+        self.count -= 1
+        return self.head.popleft()
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        if self.dir is not None:
+            self.dir.cleanup()
+            self.dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DayLayerVisited:
+    """Visited set for a day-by-day search, split into one layer per day.
+
+    A state only ever leads to states of the same or a later day, so once
+    no queued state is older than `day` the earlier layers are dropped
+    (drop_before). When more than `limit` states are held in memory the
+    largest layer is moved to an on-disk table; `encode` turns a state into
+    the stable text key stored there.
+    """
+
+    def __init__(self, encode, limit=1000000):
+        self.encode = encode
+        self.limit = limit
+        self.layers = {}
+        self.size = 0
+        self.on_disk = set()
+        self.db = None
+        self.dir = None
+
+    def add(self, day, state):
+        """Record `state` for `day`; False if it was already there."""
+        layer = self.layers.setdefault(day, set())
+        if state in layer:
+            return False
+        if day in self.on_disk:
+            row = self.db.execute("SELECT 1 FROM seen WHERE day=? AND key=?",
+                                  (day, self.encode(state))).fetchone()
+            if row is not None:
+                return False
+
+        if self.size >= self.limit:
+            self._spill()
+            layer = self.layers.setdefault(day, set())
+        layer.add(state)
+        self.size += 1
+        return True
+
+    def _spill(self):
+        if self.db is None:
+            self.dir = tempfile.TemporaryDirectory(prefix="visited-")
+            self.db = sqlite3.connect(os.path.join(self.dir.name, "seen.db"))
+            self.db.execute("PRAGMA journal_mode=OFF")
+            self.db.execute("PRAGMA synchronous=OFF")
+            self.db.execute("CREATE TABLE seen (day INTEGER, key TEXT, "
+                            "PRIMARY KEY (day, key)) WITHOUT ROWID")
+
+        day = max(self.layers, key=lambda d: len(self.layers[d]))
+        layer = self.layers.pop(day)
+        encode = self.encode
+        self.db.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?)",
+                            ((day, encode(s)) for s in layer))
+        self.db.commit()
+        self.on_disk.add(day)
+        self.size -= len(layer)
+
+    def drop_before(self, day):
+        for d in [d for d in self.layers if d < day]:
+            self.size -= len(self.layers.pop(d))
+        old = [d for d in self.on_disk if d < day]
+        if old:
+            self.db.execute("DELETE FROM seen WHERE day < ?", (day,))
+            self.on_disk.difference_update(old)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+            self.dir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DayLayerFronts:
+    """Pareto fronts of a day-by-day search, split into one layer per day.
+
+    Every (day, key) maps to the vectors recorded for it that no other
+    recorded vector dominates. Layers are dropped and spilled as in
+    DayLayerVisited: drop_before forgets the days no queued state can
+    return to, and past `limit` vectors in memory the largest layer moves
+    to an on-disk table, with `encode` giving the text stored for a key.
+    """
+
+    def __init__(self, encode, dominates, limit=1000000):
+        self.encode = encode
+        self.dominates = dominates
+        self.limit = limit
+        self.layers = {}
+        self.counts = {}
+        self.size = 0
+        self.on_disk = set()
+        self.db = None
+        self.dir = None
+
+    def _front(self, day, key):
+        layer = self.layers.get(day)
+        if layer is not None and key in layer:
+            return layer[key]
+        # A front kept in memory is newer than its copy on disk
+        if day in self.on_disk:
+            row = self.db.execute("SELECT front FROM fronts "
+                                  "WHERE day=? AND key=?",
+                                  (day, self.encode(key))).fetchone()
+            if row is not None:
+                return pickle.loads(row[0])
+        return []
+
+    def admit(self, day, key, vector):
+        """Record `vector` for (day, key); False if one there dominates it."""
+        front = self._front(day, key)
+        dominates = self.dominates
+        for u in front:
+            if dominates(u, vector):
+                return False
+        kept = [u for u in front if not dominates(vector, u)]
+        kept.append(vector)
+
+        layer = self.layers.setdefault(day, {})
+        grown = len(kept) - len(layer.get(key, ()))
+        layer[key] = kept
+        self.counts[day] = self.counts.get(day, 0) + grown
+        self.size += grown
+        if self.size > self.limit:
+            self._spill()
+        return True
+
+    def holds(self, day, key, vector):
+        """Whether `vector` is still on the front of (day, key)."""
+        return vector in self._front(day, key)
+
+    def _spill(self):
+        if self.db is None:
+            self.dir = tempfile.TemporaryDirectory(prefix="fronts-")
+            self.db = sqlite3.connect(os.path.join(self.dir.name, "fronts.db"))
+            self.db.execute("PRAGMA journal_mode=OFF")
+            self.db.execute("PRAGMA synchronous=OFF")
+            self.db.execute("CREATE TABLE fronts (day INTEGER, key TEXT, "
+                            "front BLOB, PRIMARY KEY (day, key)) WITHOUT ROWID")
+
+        day = max(self.counts, key=self.counts.get)
+        layer = self.layers.pop(day)
+        encode = self.encode
+        self.db.executemany(
+            "INSERT OR REPLACE INTO fronts VALUES (?, ?, ?)",
+            ((day, encode(k), pickle.dumps(f, pickle.HIGHEST_PROTOCOL))
+             for k, f in layer.items()))
+        self.db.commit()
+        self.on_disk.add(day)
+        self.size -= self.counts.pop(day)
+
+    def drop_before(self, day):
+        for d in [d for d in self.layers if d < day]:
+            del self.layers[d]
+            self.size -= self.counts.pop(d)
+        old = [d for d in self.on_disk if d < day]
+        if old:
+            self.db.execute("DELETE FROM fronts WHERE day < ?", (day,))
+            self.on_disk.difference_update(old)
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+            self.dir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -4,6 +4,8 @@ from math import ceil
 from collections import defaultdict
 from itertools import combinations
 
+from readyset import ReadySet
+
 
 
 def parse_input(filename):
@@ -64,6 +66,30 @@ def get_available_assignments(assignments, completed, shared, deps, gpt_limit, g
     return available
 
 
+def ready_available(ready, assignments, completed, gpt_limit, gem_limit):
+    # Same result as get_available_assignments, with the dependency check
+    # read off a ReadySet kept over the shared assignments.
+    available = []
+    for a in ready:
+        if a in completed:
+            continue
+        limit = gpt_limit if is_gpt(a) else gem_limit
+        if assignments[a] > limit:
+            continue
+        available.append(a)
+    return available
+
+
+def share(ready, newly):
+    for a in newly:
+        ready.assign(a)
+
+
+def unshare(ready, newly):
+    for a in reversed(newly):
+        ready.undo(a)
+
+
 def is_valid_combo_caseA(combo, assignments, gpt_limit, gem_limit):
     gpt_used = sum(assignments[a] for a in combo if is_gpt(a))
     gem_used = sum(assignments[a] for a in combo if not is_gpt(a))
@@ -130,6 +156,9 @@ def solve_caseA(algo, assignments, deps, gpt_limit, gem_limit, num_students, dea
     best = float('inf')
     best_path = None
 
+    # Assignments whose dependencies are all shared, for DFS / DFBB
+    ready = ReadySet({a: deps[a] for a in assignments})
+
     if algo == "DFS":
         def dfs(completed, day, shared, path):
             nonlocal nodes, best, best_path
@@ -144,11 +173,14 @@ def solve_caseA(algo, assignments, deps, gpt_limit, gem_limit, num_students, dea
                     best_path = path.copy()
                 return
 
-            available = get_available_assignments(assignments, completed, shared, 
-                                                 deps, gpt_limit, gem_limit)
-            
+            available = ready_available(ready, assignments, completed,
+                                        gpt_limit, gem_limit)
+
             if not available:
+                newly = [a for a in completed if a not in shared]
+                share(ready, newly)
                 dfs(completed, day + 1, set(completed), path)
+                unshare(ready, newly)
                 return
             
             max_today = min(num_students, len(available))
@@ -158,7 +190,10 @@ def solve_caseA(algo, assignments, deps, gpt_limit, gem_limit, num_students, dea
                         continue
                     new_completed = completed | set(combo)
                     new_path = path + [(day, list(combo))]
+                    newly = [a for a in new_completed if a not in shared]
+                    share(ready, newly)
                     dfs(new_completed, day + 1, new_completed, new_path)
+                    unshare(ready, newly)
 
         dfs(set(), 1, set(), [])
 
@@ -179,11 +214,14 @@ def solve_caseA(algo, assignments, deps, gpt_limit, gem_limit, num_students, dea
             if day >= best:
                 return
 
-            available = get_available_assignments(assignments, completed, shared,
-                                                 deps, gpt_limit, gem_limit)
-            
+            available = ready_available(ready, assignments, completed,
+                                        gpt_limit, gem_limit)
+
             if not available:
+                newly = [a for a in completed if a not in shared]
+                share(ready, newly)
                 dfbb(completed, day + 1, set(completed), path)
+                unshare(ready, newly)
                 return
             
             max_today = min(num_students, len(available))
@@ -193,7 +231,10 @@ def solve_caseA(algo, assignments, deps, gpt_limit, gem_limit, num_students, dea
                         continue
                     new_completed = completed | set(combo)
                     new_path = path + [(day, list(combo))]
+                    newly = [a for a in new_completed if a not in shared]
+                    share(ready, newly)
                     dfbb(new_completed, day + 1, new_completed, new_path)
+                    unshare(ready, newly)
 
         dfbb(set(), 1, set(), [])
 
@@ -259,6 +300,9 @@ def solve_caseB(algo, assignments, deps, gpt_limit, gem_limit, num_students, dea
     best = float('inf')
     best_path = None
 
+    # Assignments whose dependencies are all shared, for DFS / DFBB
+    ready = ReadySet({a: deps[a] for a in assignments})
+
     if algo == "DFS":
         def dfs(completed, day, gpt_left, gem_left, shared, path):
             nonlocal nodes, best, best_path
@@ -275,11 +319,9 @@ def solve_caseB(algo, assignments, deps, gpt_limit, gem_limit, num_students, dea
 
             progress = False
 
-            for a in assignments:
+            for a in ready:
                 if a in completed:
                     continue
-                if not deps_done(a, shared, deps):
-                    continue
 
                 if is_gpt(a):
                     if gpt_left < assignments[a]:
@@ -298,7 +340,10 @@ def solve_caseB(algo, assignments, deps, gpt_limit, gem_limit, num_students, dea
                 completed.remove(a)
 
             if not progress:
+                newly = [a for a in completed if a not in shared]
+                share(ready, newly)
                 dfs(completed, day + 1, gpt_limit, gem_limit, set(completed), path)
+                unshare(ready, newly)
 
         dfs(set(), 1, gpt_limit, gem_limit, set(), [])
 
@@ -321,11 +366,9 @@ def solve_caseB(algo, assignments, deps, gpt_limit, gem_limit, num_students, dea
 
             progress = False
 
-            for a in assignments:
+            for a in ready:
                 if a in completed:
                     continue
-                if not deps_done(a, shared, deps):
-                    continue
 
                 if is_gpt(a):
                     if gpt_left < assignments[a]:
@@ -344,7 +387,10 @@ def solve_caseB(algo, assignments, deps, gpt_limit, gem_limit, num_students, dea
                 completed.remove(a)
 
             if not progress:
+                newly = [a for a in completed if a not in shared]
+                share(ready, newly)
                 dfbb(completed, day + 1, gpt_limit, gem_limit, set(completed), path)
+                unshare(ready, newly)
 
         dfbb(set(), 1, gpt_limit, gem_limit, set(), [])
 